@@ -0,0 +1,74 @@
+import string
+import typing as tp
+
+
+class Alphabet:
+    """
+    Alphabet for shift ciphers: one or more cases of the same length.
+    The lookup and str.translate tables are built once, on creation.
+    >>> Alphabet("ABC", "abc").translation_table(1)[ord("c")] == ord("a")
+    True
+    """
+
+    __slots__ = ("cases", "size", "_positions", "_tables")
+
+    def __init__(self, *cases: str) -> None:
+        if not cases or not cases[0]:
+            raise ValueError("Alphabet must contain at least one letter")
+        if any(len(case) != len(cases[0]) for case in cases):
+            raise ValueError("All cases of an alphabet must have the same length")
+        self.cases = cases
+        self.size = len(cases[0])
+        self._positions = {letter: pos for case in cases for pos, letter in enumerate(case)}
+        if len(self._positions) != self.size * len(cases):
+            raise ValueError("Alphabet letters must be unique")
+        self._tables: tp.List[tp.Dict[int, int]] = []
+        for shift in range(self.size):
+            table: tp.Dict[int, int] = {}
+            for case in cases:
+                table.update(str.maketrans(case, case[shift:] + case[:shift]))
+            self._tables.append(table)
+
+    def __contains__(self, letter: object) -> bool:
+        return letter in self._positions
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Alphabet) and self.cases == other.cases
+
+    def __hash__(self) -> int:
+        return hash(self.cases)
+
+    def __repr__(self) -> str:
+        return f"Alphabet{self.cases!r}"
+
+    @property
+    def is_ascii(self) -> bool:
+        return all(case.isascii() for case in self.cases)
+
+    def position(self, letter: str) -> int:
+        """
+        Position of a letter in the alphabet, ignoring case.
+        >>> CYRILLIC.position("ё")
+        6
+        """
+        try:
+            return self._positions[letter]
+        except KeyError:
+            raise ValueError(f"{letter!r} is not a letter of {self!r}") from None
+
+    def shifts(self, keyword: str) -> tp.List[int]:
+        """
+        Shifts given by the letters of a keyword.
+        >>> LATIN.shifts("LEMON")
+        [11, 4, 12, 14, 13]
+        """
+        return [self.position(letter) for letter in keyword]
+
+    def translation_table(self, shift: int) -> tp.Dict[int, int]:
+        """str.translate table that shifts every case by shift positions."""
+        return self._tables[shift % self.size]
+
+
+LATIN = Alphabet(string.ascii_uppercase, string.ascii_lowercase)
+CYRILLIC = Alphabet("АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ", "абвгдеёжзийклмнопрстуфхцчшщъыьэюя")
+ALPHABETS = {"latin": LATIN, "cyrillic": CYRILLIC}
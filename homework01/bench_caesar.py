@@ -0,0 +1,166 @@
+"""Caesar cipher benchmarks: python bench_caesar.py <benchmark> [--sizes 1K,1M,100M]"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+import typing as tp
+
+import caesar
+
+SUFFIXES = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def parse_size(size: str) -> int:
+    size = size.strip().upper()
+    if size[-1] in SUFFIXES:
+        return int(size[:-1]) * SUFFIXES[size[-1]]
+    return int(size)
+
+
+def make_text(size: int) -> str:
+    alphabet = string.ascii_letters + string.digits + " .,-\n"
+    chunk = "".join(random.choice(alphabet) for _ in range(1 << 16))
+    return (chunk * (size // len(chunk) + 1))[:size]
+
+
+def encrypt_caesar_loop(plaintext: str, shift: int = 3) -> str:
+    """Original per-character implementation, kept for comparison."""
+    ciphertext = ""
+    for symbol in plaintext:
+        if "A" <= symbol <= "Z":
+            ciphertext += chr(ord("A") + (ord(symbol) - ord("A") + shift) % 26)
+        elif "a" <= symbol <= "z":
+            ciphertext += chr(ord("a") + (ord(symbol) - ord("a") + shift) % 26)
+        else:
+            ciphertext += symbol
+    return ciphertext
+
+
+def measure(func: tp.Callable[[], tp.Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench_table(sizes: tp.List[int]) -> None:
+    print(f"{'size':>12} {'loop, s':>10} {'table, s':>10} {'speedup':>8}")
+    for size in sizes:
+        text = make_text(size)
+        loop = measure(lambda: encrypt_caesar_loop(text, 7))
+        table = measure(lambda: caesar.encrypt_caesar(text, 7))
+        print(f"{size:>12} {loop:>10.4f} {table:>10.4f} {loop / table:>8.1f}")
+
+
+def write_text_file(path: str, size: int) -> None:
+    block = make_text(min(size, 1 << 20))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for _ in range(size // len(block)):
+            f.write(block)
+        f.write(block[: size % len(block)])
+
+
+def measure_file(process_file: tp.Callable[[str, str], None], src: str, dst: str) -> tp.Tuple[float, int]:
+    """File processing time and peak Python memory."""
+    elapsed = measure(lambda: process_file(src, dst))
+    # tracemalloc slows everything down a lot, so memory is measured in a separate run
+    tracemalloc.start()
+    process_file(src, dst)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_stream(sizes: tp.List[int], process_file: tp.Callable[[str, str], None]) -> None:
+    """Streaming file encryption throughput and peak Python memory."""
+    print(f"{'size':>12} {'MB/s':>10} {'peak, MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "src.txt"), os.path.join(tmp, "dst.txt")
+        for size in sizes:
+            write_text_file(src, size)
+            elapsed, peak = measure_file(process_file, src, dst)
+            print(f"{size:>12} {size / elapsed / 2**20:>10.1f} {peak / 2**20:>10.1f}")
+
+
+def bench_mmap(
+    sizes: tp.List[int], encrypt: tp.Callable[[str], str], process_mapped: tp.Callable[[str, str], None]
+) -> None:
+    """Reading the whole file into a str vs mmap: throughput and peak Python memory."""
+
+    def read_whole(src: str, dst: str) -> None:
+        with open(src, encoding="utf-8", newline="") as fin, open(dst, "w", encoding="utf-8", newline="") as fout:
+            fout.write(encrypt(fin.read()))
+
+    print(f"{'size':>12} {'mode':>6} {'MB/s':>10} {'peak, MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "src.txt"), os.path.join(tmp, "dst.txt")
+        for size in sizes:
+            write_text_file(src, size)
+            for mode, process_file in (("str", read_whole), ("mmap", process_mapped)):
+                elapsed, peak = measure_file(process_file, src, dst)
+                print(f"{size:>12} {mode:>6} {size / elapsed / 2**20:>10.1f} {peak / 2**20:>10.1f}")
+
+
+def brute_force_caesar(ciphertext: str) -> int:
+    """The old way: 26 full decryptions, each scored separately."""
+
+    def score(shift: int) -> float:
+        histogram = caesar.letter_histogram(caesar.decrypt_caesar(ciphertext, shift))
+        return dict(caesar.rank_shifts(histogram))[0]
+
+    return min(range(26), key=score)
+
+
+def bench_crack(sizes: tp.List[int]) -> None:
+    """Brute force over 26 shifts with full decryption vs a single histogram."""
+    print(f"{'size':>12} {'brute, s':>10} {'crack, s':>10} {'speedup':>8}")
+    for size in sizes:
+        text = caesar.encrypt_caesar(make_text(size), 11)
+        brute = measure(lambda: brute_force_caesar(text))
+        crack = measure(lambda: caesar.crack_caesar(text))
+        print(f"{size:>12} {brute:>10.4f} {crack:>10.4f} {brute / crack:>8.1f}")
+
+
+def make_messages(count: int, length: int = 16) -> tp.List[str]:
+    text = make_text(count * length)
+    return [text[pos : pos + length] for pos in range(0, len(text), length)]
+
+
+def bench_batch(
+    counts: tp.List[int], per_call: tp.Callable[[str], str], batch: tp.Callable[[tp.List[str]], tp.List[str]]
+) -> None:
+    """Throughput: one call per message vs a single batch call."""
+    print(f"{'messages':>12} {'per-call msg/s':>15} {'batch msg/s':>15} {'speedup':>8}")
+    for count in counts:
+        messages = make_messages(count)
+        single = measure(lambda: [per_call(message) for message in messages])
+        batched = measure(lambda: batch(messages))
+        print(f"{count:>12} {count / single:>15.0f} {count / batched:>15.0f} {single / batched:>8.1f}")
+
+
+BENCHMARKS: tp.Dict[str, tp.Callable[[tp.List[int]], None]] = {
+    "table": bench_table,
+    "stream": lambda sizes: bench_stream(sizes, lambda src, dst: caesar.encrypt_file(src, dst, 7)),
+    "mmap": lambda sizes: bench_mmap(
+        sizes,
+        lambda text: caesar.encrypt_caesar(text, 7),
+        lambda src, dst: caesar.encrypt_file_mmap(src, dst, 7),
+    ),
+    "crack": bench_crack,
+    # for batch the sizes are the number of 16-character messages
+    "batch": lambda sizes: bench_batch(
+        sizes,
+        lambda message: caesar.encrypt_caesar(message, 7),
+        lambda batch: caesar.encrypt_caesar_batch(batch, 7),
+    ),
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("what", choices=list(BENCHMARKS), nargs="?", default="table")
+    parser.add_argument("--sizes", default="1K,1M,100M")
+    args = parser.parse_args()
+    BENCHMARKS[args.what]([parse_size(size) for size in args.sizes.split(",")])
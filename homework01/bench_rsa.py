@@ -0,0 +1,214 @@
+"""RSA benchmarks: python bench_rsa.py <benchmark> [--bits 512,1024,2048]"""
+
+import argparse
+import itertools
+import math
+import os
+import random
+import tempfile
+import typing as tp
+
+import rsa
+from bench_caesar import make_text, measure, measure_file
+
+
+def make_private_key(bits: int) -> rsa.PrivateKey:
+    return rsa.generate_keypair_bits(bits)[1]
+
+
+def bench_primes(bits_list: tp.List[int], repeat: int = 5) -> None:
+    """Mean time of generate_prime and generate_keypair_bits."""
+    print(f"{'bits':>6} {'prime, s':>10} {'keypair, s':>11}")
+    for bits in bits_list:
+        prime = measure(lambda: [rsa.generate_prime(bits) for _ in range(repeat)]) / repeat
+        keypair = measure(lambda: [rsa.generate_keypair_bits(bits) for _ in range(repeat)]) / repeat
+        print(f"{bits:>6} {prime:>10.3f} {keypair:>11.3f}")
+
+
+def bench_crt(bits_list: tp.List[int], repeat: int = 100) -> None:
+    """Decryption of a single block: pow(c, d, n) vs CRT."""
+    print(f"{'bits':>6} {'pow, ms':>10} {'crt, ms':>10} {'speedup':>8}")
+    for bits in bits_list:
+        key = make_private_key(bits)
+        values = [random.randrange(key.n) for _ in range(repeat)]
+        plain = measure(lambda: [pow(value, key.d, key.n) for value in values]) / repeat
+        crt = measure(lambda: [key.power(value) for value in values]) / repeat
+        print(f"{bits:>6} {plain * 1e3:>10.3f} {crt * 1e3:>10.3f} {plain / crt:>8.1f}")
+
+
+def bench_blocks(bits_list: tp.List[int], size: int = 1 << 10) -> None:
+    """A message of size bytes: per-character encryption vs block mode."""
+    print(f"{'bits':>6} {'mode':>6} {'modexps':>8} {'encrypt, s':>11} {'decrypt, s':>11} {'bytes':>8}")
+    text = make_text(size)
+    for bits in bits_list:
+        public, private = rsa.generate_keypair_bits(bits)
+        _, block = rsa.block_sizes(public[1])
+        cipher = rsa.encrypt(public, text)
+        encrypt = measure(lambda: rsa.encrypt(public, text))
+        decrypt = measure(lambda: rsa.decrypt(private, cipher))
+        print(f"{bits:>6} {'char':>6} {len(cipher):>8} {encrypt:>11.4f} {decrypt:>11.4f} {len(cipher) * block:>8}")
+        blocks = rsa.encrypt_blocks(public, text)
+        encrypt = measure(lambda: rsa.encrypt_blocks(public, text))
+        decrypt = measure(lambda: rsa.decrypt_blocks(private, blocks))
+        print(f"{bits:>6} {'block':>6} {len(blocks) // block:>8} {encrypt:>11.4f} {decrypt:>11.4f} {len(blocks):>8}")
+
+
+def bench_inverse(bits_list: tp.List[int], count: int = 10000) -> None:
+    """Inverting count values modulo a bits-bit prime: one by one vs batch_inverse."""
+    print(f"{'bits':>6} {'single, s':>10} {'pow, s':>10} {'batch, s':>10} {'speedup':>8}")
+    for bits in bits_list:
+        modulus = rsa.generate_prime(bits)
+        values = [random.randrange(1, modulus) for _ in range(count)]
+        single = measure(lambda: [rsa.multiplicative_inverse(value, modulus) for value in values])
+        builtin = measure(lambda: [pow(value, -1, modulus) for value in values])
+        batch = measure(lambda: rsa.batch_inverse(values, modulus))
+        print(f"{bits:>6} {single:>10.4f} {builtin:>10.4f} {batch:>10.4f} {single / batch:>8.1f}")
+
+
+def bench_farm(bits_list: tp.List[int], max_workers: int, count: int = 32) -> None:
+    """Keys per second from generate_keypairs with 1 to max_workers processes."""
+    print(f"{'bits':>6} {'workers':>8} {'keys/s':>10} {'speedup':>8}")
+    for bits in bits_list:
+        base = 0.0
+        for workers in range(1, max_workers + 1):
+            elapsed = measure(lambda: list(rsa.generate_keypairs(count, bits, workers=workers)))
+            base = base or elapsed
+            print(f"{bits:>6} {workers:>8} {count / elapsed:>10.2f} {base / elapsed:>8.2f}")
+
+
+def bench_stream(bits_list: tp.List[int], size: int = 1 << 18) -> None:
+    """Encrypting and decrypting a file of size bytes in the block format: MB/s and peak Python memory."""
+    print(f"{'bits':>6} {'mode':>8} {'MB/s':>8} {'peak, MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        src, enc, dec = (os.path.join(tmp, name) for name in ("src", "enc", "dec"))
+        with open(src, "wb") as f:
+            f.write(os.urandom(size))
+        for bits in bits_list:
+            public, private = rsa.generate_keypair_bits(bits)
+            for mode, process_file in (
+                ("encrypt", lambda: rsa.encrypt_file(public, src, enc)),
+                ("decrypt", lambda: rsa.decrypt_file(private, enc, dec)),
+            ):
+                elapsed, peak = measure_file(lambda _src, _dst: process_file(), src, enc)
+                print(f"{bits:>6} {mode:>8} {size / elapsed / 2**20:>8.2f} {peak / 2**20:>10.1f}")
+
+
+def bench_cached(bits_list: tp.List[int], count: int = 1000) -> None:
+    """Latency (us) per 32-byte message: tuple keys vs PublicKey/PrivateKey."""
+    print(f"{'bits':>6} {'op':>8} {'tuple, us':>10} {'cached, us':>11} {'speedup':>8}")
+    messages = [make_text(32) for _ in range(count)]
+    for bits in bits_list:
+        public, private = rsa.generate_keypair_bits(bits)
+        ciphertexts = rsa.encrypt_many(public, messages)
+        for op, tuple_call, cached_call in (
+            (
+                "encrypt",
+                lambda: [rsa.encrypt_blocks((public.e, public.n), message) for message in messages],
+                lambda: rsa.encrypt_many(public, messages),
+            ),
+            (
+                "decrypt",
+                lambda: [rsa.decrypt_blocks((private.d, private.n), ciphertext) for ciphertext in ciphertexts],
+                lambda: rsa.decrypt_many(private, ciphertexts),
+            ),
+        ):
+            plain = measure(tuple_call) / count
+            cached = measure(cached_call) / count
+            print(f"{bits:>6} {op:>8} {plain * 1e6:>10.1f} {cached * 1e6:>11.1f} {plain / cached:>8.1f}")
+
+
+def is_prime_trial(n: int) -> bool:
+    """The old trial division by odd numbers up to sqrt(n), kept for comparison."""
+    if n <= 3:
+        return n > 1
+    if n % 2 == 0:
+        return False
+    i = 3
+    while i * i <= n:
+        if n % i == 0:
+            return False
+        i += 2
+    return True
+
+
+def bench_sieve(bits_list: tp.List[int], count: int = 10000) -> None:
+    """
+    Queries per second for bits-bit numbers and sieve startup time: building vs mmap.
+    The sieve is never built past SIEVE_LIMIT, so bits are capped at its bit length
+    and the default key sizes (512,1024,2048) collapse into a single run.
+    """
+    print(f"{'bits':>6} {'trial q/s':>12} {'is_prime q/s':>13} {'sieve q/s':>12}")
+    max_bits = rsa.SIEVE_LIMIT.bit_length() - 1
+    for bits in sorted({min(bits, max_bits) for bits in bits_list}):
+        values = [random.getrandbits(bits) for _ in range(count)]
+        sieve = rsa.PrimeSieve(1 << bits, max_limit=1 << bits)
+        trial = measure(lambda: [is_prime_trial(n) for n in values])
+        fast = measure(lambda: [rsa.is_prime(n) for n in values])
+        lookup = measure(lambda: [n in sieve for n in values])
+        print(f"{bits:>6} {count / trial:>12.0f} {count / fast:>13.0f} {count / lookup:>12.0f}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sieve")
+        build = measure(lambda: rsa.PrimeSieve(rsa.SIEVE_LIMIT).save(path))
+        load = measure(lambda: rsa.PrimeSieve.load(path))
+        print(f"sieve below {rsa.SIEVE_LIMIT}: build {build:.4f} s, load {load:.6f} s")
+
+
+def bench_exponent(bits_list: tp.List[int], size: int = 1 << 14) -> None:
+    """Block encryption of size bytes: random e vs e = 65537."""
+    print(f"{'bits':>6} {'random e, KB/s':>15} {'65537, KB/s':>12} {'speedup':>8}")
+    text = make_text(size)
+    for bits in bits_list:
+        _, private = rsa.generate_keypair_bits(bits)
+        random_public, _ = rsa.generate_keypair(private.p, private.q, exponent=None)
+        fixed_public, _ = rsa.generate_keypair(private.p, private.q)
+        slow = measure(lambda: rsa.encrypt_blocks(random_public, text))
+        fast = measure(lambda: rsa.encrypt_blocks(fixed_public, text))
+        print(f"{bits:>6} {size / slow / 2**10:>15.1f} {size / fast / 2**10:>12.1f} {slow / fast:>8.1f}")
+
+
+def make_moduli(count: int, bits: int, prime_bits: int = 40) -> tp.List[int]:
+    """
+    Synthetic bits-bit moduli: products of distinct prime_bits-bit primes, which the
+    segmented sieve finds quickly. Moduli 0 and count - 1 share a prime factor.
+    """
+    per_modulus = max(2, bits // prime_bits)
+    primes = rsa.primes_in_range(1 << (prime_bits - 1), 1 << prime_bits)
+    moduli = [math.prod(itertools.islice(primes, per_modulus)) for _ in range(count)]
+    shared = next(primes)
+    moduli[0] *= shared
+    moduli[-1] *= shared
+    return moduli
+
+
+def bench_batch_gcd(bits_list: tp.List[int], count: int = 10000, sample: int = 2000) -> None:
+    """batch_gcd on count moduli vs pairwise gcd (timed on sample pairs and extrapolated)."""
+    print(f"{'bits':>6} {'moduli':>8} {'batch, s':>10} {'pairwise, s':>12} {'found':>6}")
+    for bits in bits_list:
+        moduli = make_moduli(count, bits)
+        found: tp.List[int] = []
+        batch = measure(lambda: found.extend(i for i, g in enumerate(rsa.batch_gcd(moduli)) if g != 1))
+        pairs = [(random.choice(moduli), random.choice(moduli)) for _ in range(sample)]
+        pair = measure(lambda: [rsa.gcd(a, b) for a, b in pairs]) / sample
+        pairwise = pair * count * (count - 1) / 2
+        print(f"{bits:>6} {count:>8} {batch:>10.3f} {pairwise:>12.1f} {len(found):>6}")
+
+
+BENCHMARKS: tp.Dict[str, tp.Callable[[tp.List[int]], None]] = {
+    "crt": bench_crt,
+    "primes": bench_primes,
+    "blocks": bench_blocks,
+    "inverse": bench_inverse,
+    "sieve": bench_sieve,
+    "exponent": bench_exponent,
+    "batch_gcd": bench_batch_gcd,
+    "stream": bench_stream,
+    "cached": bench_cached,
+    "farm": lambda bits_list: bench_farm(bits_list, os.cpu_count() or 1),
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("what", choices=list(BENCHMARKS), nargs="?", default="crt")
+    parser.add_argument("--bits", default="512,1024,2048")
+    args = parser.parse_args()
+    BENCHMARKS[args.what]([int(bits) for bits in args.bits.split(",")])
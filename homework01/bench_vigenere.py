@@ -0,0 +1,144 @@
+"""Vigenere cipher benchmarks: python bench_vigenere.py <benchmark> [--sizes 1M,100M]"""
+
+import argparse
+import os
+import random
+import string
+import typing as tp
+
+import caesar
+import cryptanalysis
+import vigenere
+from alphabet import CYRILLIC, LATIN
+from bench_caesar import (
+    bench_batch,
+    bench_mmap,
+    bench_stream,
+    make_text,
+    measure,
+    parse_size,
+)
+
+# English text for the crack_vigenere benchmark
+ENGLISH_SAMPLE = (
+    "It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of "
+    "foolishness, it was the epoch of belief, it was the epoch of incredulity, it was the season of Light, "
+    "it was the season of Darkness, it was the spring of hope, it was the winter of despair, we had "
+    "everything before us, we had nothing before us, we were all going direct to Heaven, we were all going "
+    "direct the other way - in short, the period was so far like the present period, that some of its "
+    "noisiest authorities insisted on its being received, for good or for evil, in the superlative degree "
+    "of comparison only. There were a king with a large jaw and a queen with a plain face, on the throne of "
+    "England; there were a king with a large jaw and a queen with a fair face, on the throne of France."
+)
+
+
+def encrypt_vigenere_loop(plaintext: str, keyword: str) -> str:
+    """Original per-character implementation for Latin letters, kept for comparison."""
+    ciphertext = ""
+    for key_index, symbol in enumerate(plaintext):
+        shift = ord(keyword[key_index % len(keyword)])
+        if "A" <= symbol <= "Z":
+            ciphertext += chr(ord("A") + (ord(symbol) - ord("A") + shift - ord("A")) % 26)
+        elif "a" <= symbol <= "z":
+            ciphertext += chr(ord("a") + (ord(symbol) - ord("a") + shift - ord("a")) % 26)
+        else:
+            ciphertext += symbol
+    return ciphertext
+
+
+def bench_alphabet(sizes: tp.List[int]) -> None:
+    """Cost per character (ns) for Latin and Cyrillic text without numpy, compared with the original loop."""
+    cyrillic = "абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ .,\n"
+    print(f"{'size':>12} {'cipher':>10} {'old loop':>10} {'latin':>10} {'cyrillic':>10}")
+    for size in sizes:
+        latin_text = make_text(size)
+        cyrillic_text = "".join(cyrillic[ord(symbol) % len(cyrillic)] for symbol in latin_text)
+        loop = measure(lambda: encrypt_vigenere_loop(latin_text, "LEMON"))
+        latin = measure(lambda: vigenere._shift_chars(latin_text, vigenere.compile_key("LEMON"), 1))
+        cyr = measure(lambda: vigenere._shift_chars(cyrillic_text, vigenere.compile_key("КЛЮЧ", CYRILLIC), 1))
+        print(
+            f"{size:>12} {'vigenere':>10} {loop / size * 1e9:>10.1f} {latin / size * 1e9:>10.1f} {cyr / size * 1e9:>10.1f}"
+        )
+        latin = measure(lambda: caesar.encrypt_caesar(latin_text, 3, LATIN))
+        cyr = measure(lambda: caesar.encrypt_caesar(cyrillic_text, 3, CYRILLIC))
+        print(f"{size:>12} {'caesar':>10} {'':>10} {latin / size * 1e9:>10.1f} {cyr / size * 1e9:>10.1f}")
+
+
+def bench_numpy(sizes: tp.List[int]) -> None:
+    """Per-character implementation vs the vectorized one on ASCII data."""
+    print(f"{'size':>12} {'scalar MB/s':>12} {'numpy MB/s':>12}")
+    for size in sizes:
+        data = make_text(size).encode("ascii")
+        scalar = measure(lambda: vigenere._shift_chars(data.decode("ascii"), vigenere.compile_key("LEMON"), 1))
+        vector = measure(lambda: vigenere.encrypt_vigenere_bytes(data, "LEMON"))
+        print(f"{size:>12} {size / scalar / 2**20:>12.1f} {size / vector / 2**20:>12.1f}")
+
+
+def bench_parallel(sizes: tp.List[int], max_workers: int) -> None:
+    """Scaling of encrypt_vigenere_parallel from 1 to max_workers processes."""
+    print(f"{'size':>12} {'workers':>8} {'MB/s':>10} {'speedup':>8}")
+    for size in sizes:
+        text = make_text(size)
+        base = 0.0
+        for workers in range(1, max_workers + 1):
+            elapsed = measure(lambda: vigenere.encrypt_vigenere_parallel(text, "LEMON", workers=workers))
+            base = base or elapsed
+            print(f"{size:>12} {workers:>8} {size / elapsed / 2**20:>10.1f} {base / elapsed:>8.2f}")
+
+
+def bench_keys(sizes: tp.List[int]) -> None:
+    """Call time (us) when the keyword is parsed every time vs taken from compile_key."""
+    print(f"{'size':>12} {'key len':>8} {'parse, us':>10} {'cached, us':>11} {'speedup':>8}")
+    for size in sizes:
+        text = make_text(size)
+        repeat = max(1, (1 << 20) // size)
+        for key_len in (5, 1 << 10, 1 << 12):
+            keyword = "".join(random.choice(string.ascii_letters) for _ in range(key_len))
+            key = vigenere.compile_key(keyword)
+            parse = measure(
+                lambda: [vigenere.encrypt_vigenere(text, vigenere.VigenereKey(keyword)) for _ in range(repeat)]
+            )
+            cached = measure(lambda: [vigenere.encrypt_vigenere(text, key) for _ in range(repeat)])
+            print(
+                f"{size:>12} {key_len:>8} {parse / repeat * 1e6:>10.1f} {cached / repeat * 1e6:>11.1f}"
+                f" {parse / cached:>8.1f}"
+            )
+
+
+def bench_crack(sizes: tp.List[int]) -> None:
+    """Time of each crack_vigenere phase on English text."""
+    print(f"{'size':>12} {'total, s':>10}  phases")
+    for size in sizes:
+        text = (ENGLISH_SAMPLE * (size // len(ENGLISH_SAMPLE) + 1))[:size]
+        ciphertext = vigenere.encrypt_vigenere(text.upper(), "CRYPTANALYSIS")
+        result = cryptanalysis.crack_vigenere(ciphertext)
+        phases = " ".join(f"{name}={elapsed:.4f}" for name, elapsed in result.timings.items())
+        print(f"{size:>12} {sum(result.timings.values()):>10.4f}  {phases} key={result.keyword}")
+
+
+BENCHMARKS: tp.Dict[str, tp.Callable[[tp.List[int]], None]] = {
+    "stream": lambda sizes: bench_stream(sizes, lambda src, dst: vigenere.encrypt_file(src, dst, "LEMON")),
+    "mmap": lambda sizes: bench_mmap(
+        sizes,
+        lambda text: vigenere.encrypt_vigenere(text, "LEMON"),
+        lambda src, dst: vigenere.encrypt_file_mmap(src, "LEMON", dst),
+    ),
+    "numpy": bench_numpy,
+    "parallel": lambda sizes: bench_parallel(sizes, os.cpu_count() or 1),
+    "keys": bench_keys,
+    "crack": bench_crack,
+    # for batch the sizes are the number of 16-character messages
+    "batch": lambda sizes: bench_batch(
+        sizes,
+        lambda message: vigenere.encrypt_vigenere(message, "LEMON"),
+        lambda batch: vigenere.encrypt_vigenere_batch(batch, "LEMON"),
+    ),
+    "alphabet": bench_alphabet,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("what", choices=list(BENCHMARKS), nargs="?", default="stream")
+    parser.add_argument("--sizes", default="1M,100M")
+    args = parser.parse_args()
+    BENCHMARKS[args.what]([parse_size(size) for size in args.sizes.split(",")])
@@ -1,4 +1,30 @@
-def encrypt_caesar(plaintext: str, shift: int = 3) -> str:
+import argparse
+import collections
+import math
+import pathlib
+import typing as tp
+
+from alphabet import ALPHABETS, LATIN, Alphabet
+from filemap import CHUNK_SIZE, WINDOW_SIZE, transform_mapped, transform_text_file
+
+BATCH_SEPARATOR = "\x00"
+# Frequencies of the letters A..Z in English text, %
+# fmt: off
+ENGLISH_FREQUENCIES = (
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+)
+# fmt: on
+_ENGLISH_PROBABILITIES = tuple(freq / sum(ENGLISH_FREQUENCIES) for freq in ENGLISH_FREQUENCIES)
+
+
+class CaesarCandidate(tp.NamedTuple):
+    shift: int
+    chi_squared: float
+    confidence: float
+
+
+def encrypt_caesar(plaintext: str, shift: int = 3, alphabet: Alphabet = LATIN) -> str:
     """
     Encrypts plaintext using a Caesar cipher.
     >>> encrypt_caesar("PYTHON")
@@ -9,25 +35,13 @@ def encrypt_caesar(plaintext: str, shift: int = 3) -> str:
     'Sbwkrq3.6'
     >>> encrypt_caesar("")
     ''
+    >>> encrypt_caesar("Привет, мир!", 3, ALPHABETS["cyrillic"])
+    'Тулезх, плу!'
     """
-    ciphertext = ""
-    for symbol in plaintext:
-        if "A" <= symbol <= "Z":
-            start = ord("A")
-            pos = ord(symbol) - start
-            new_pos = (pos + shift) % 26
-            ciphertext += chr(start + new_pos)
-        elif "a" <= symbol <= "z":
-            start = ord("a")
-            pos = ord(symbol) - start
-            new_pos = (pos + shift) % 26
-            ciphertext += chr(start + new_pos)
-        else:
-            ciphertext += symbol
-    return ciphertext
-
-
-def decrypt_caesar(ciphertext: str, shift: int = 3) -> str:
+    return plaintext.translate(alphabet.translation_table(shift))
+
+
+def decrypt_caesar(ciphertext: str, shift: int = 3, alphabet: Alphabet = LATIN) -> str:
     """
     Decrypts a ciphertext using a Caesar cipher.
     >>> decrypt_caesar("SBWKRQ")
@@ -39,18 +53,189 @@ def decrypt_caesar(ciphertext: str, shift: int = 3) -> str:
     >>> decrypt_caesar("")
     ''
     """
-    plaintext = ""
-    for symbol in ciphertext:
-        if "A" <= symbol <= "Z":
-            start = ord("A")
-            pos = ord(symbol) - start
-            new_pos = (pos - shift) % 26
-            plaintext += chr(start + new_pos)
-        elif "a" <= symbol <= "z":
-            start = ord("a")
-            pos = ord(symbol) - start
-            new_pos = (pos - shift) % 26
-            plaintext += chr(start + new_pos)
-        else:
-            plaintext += symbol
-    return plaintext
+    return ciphertext.translate(alphabet.translation_table(-shift))
+
+
+def encrypt_caesar_stream(chunks: tp.Iterable[str], shift: int = 3, alphabet: Alphabet = LATIN) -> tp.Iterator[str]:
+    """
+    Encrypts a stream of text chunks, one chunk at a time.
+    >>> "".join(encrypt_caesar_stream(["PYT", "HON"]))
+    'SBWKRQ'
+    """
+    table = alphabet.translation_table(shift)
+    for chunk in chunks:
+        yield chunk.translate(table)
+
+
+def decrypt_caesar_stream(chunks: tp.Iterable[str], shift: int = 3, alphabet: Alphabet = LATIN) -> tp.Iterator[str]:
+    """
+    Decrypts a stream of text chunks, one chunk at a time.
+    >>> "".join(decrypt_caesar_stream(["SBW", "KRQ"]))
+    'PYTHON'
+    """
+    return encrypt_caesar_stream(chunks, -shift, alphabet)
+
+
+def _batch(
+    messages: tp.Iterable[str], shift: tp.Union[int, tp.Iterable[int]], direction: int, alphabet: Alphabet
+) -> tp.List[str]:
+    messages = list(messages)
+    if isinstance(shift, int):
+        table = alphabet.translation_table(direction * shift)
+        # one translate over the joined string is faster than a million short calls,
+        # as long as the separator does not occur in the messages themselves
+        joined = BATCH_SEPARATOR.join(messages)
+        if messages and joined.count(BATCH_SEPARATOR) == len(messages) - 1:
+            return joined.translate(table).split(BATCH_SEPARATOR)
+        return [message.translate(table) for message in messages]
+    shifts = list(shift)
+    if len(shifts) != len(messages):
+        raise ValueError("Number of shifts must match number of messages")
+    return [message.translate(alphabet.translation_table(direction * item)) for message, item in zip(messages, shifts)]
+
+
+def encrypt_caesar_batch(
+    messages: tp.Iterable[str], shift: tp.Union[int, tp.Iterable[int]] = 3, alphabet: Alphabet = LATIN
+) -> tp.List[str]:
+    """
+    Encrypts many messages at once, with one shift or a shift per message.
+    >>> encrypt_caesar_batch(["PYTHON", "python"])
+    ['SBWKRQ', 'sbwkrq']
+    >>> encrypt_caesar_batch(["abc", "abc"], [1, 2])
+    ['bcd', 'cde']
+    """
+    return _batch(messages, shift, 1, alphabet)
+
+
+def decrypt_caesar_batch(
+    messages: tp.Iterable[str], shift: tp.Union[int, tp.Iterable[int]] = 3, alphabet: Alphabet = LATIN
+) -> tp.List[str]:
+    """
+    Decrypts many messages at once, with one shift or a shift per message.
+    >>> decrypt_caesar_batch(["SBWKRQ", "sbwkrq"])
+    ['PYTHON', 'python']
+    """
+    return _batch(messages, shift, -1, alphabet)
+
+
+def letter_histogram(text: str) -> tp.List[int]:
+    """
+    Counts latin letters A..Z in text, ignoring case, in a single pass.
+    >>> letter_histogram("Abca")[:4]
+    [2, 1, 1, 0]
+    """
+    counts = collections.Counter(text)
+    return [counts[upper] + counts[lower] for upper, lower in zip(*LATIN.cases)]
+
+
+def rank_shifts(histogram: tp.Sequence[int]) -> tp.List[tp.Tuple[int, float]]:
+    """
+    Scores every shift by chi-squared distance from English letter frequencies.
+    Returns (shift, chi_squared) pairs, the most likely shift first.
+    """
+    total = sum(histogram)
+    if total == 0:
+        return [(shift, 0.0) for shift in range(26)]
+    expected = [prob * total for prob in _ENGLISH_PROBABILITIES]
+    scores = []
+    for shift in range(26):
+        chi_squared = sum((histogram[(pos + shift) % 26] - expected[pos]) ** 2 / expected[pos] for pos in range(26))
+        scores.append((shift, chi_squared))
+    return sorted(scores, key=lambda score: score[1])
+
+
+def crack_caesar(ciphertext: str, sample_size: tp.Optional[int] = None) -> tp.List[CaesarCandidate]:
+    """
+    Recovers the shift of an English ciphertext by frequency analysis.
+    Only the first sample_size characters are analysed when it is given.
+    Confidence is the relative likelihood of the candidate, all confidences add up to 1.
+    >>> crack_caesar(encrypt_caesar("Frequency analysis breaks the Caesar cipher easily", 11))[0].shift
+    11
+    """
+    sample = ciphertext if sample_size is None else ciphertext[:sample_size]
+    scores = rank_shifts(letter_histogram(sample))
+    best = scores[0][1]
+    # chi-squared ~ -2 log(likelihood), so the candidate weights are exp(-delta / 2)
+    weights = [math.exp((best - chi_squared) / 2) for _, chi_squared in scores]
+    total = sum(weights)
+    return [
+        CaesarCandidate(shift, chi_squared, weight / total) for (shift, chi_squared), weight in zip(scores, weights)
+    ]
+
+
+def encrypt_file(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Union[str, pathlib.Path],
+    shift: int = 3,
+    chunk_size: int = CHUNK_SIZE,
+    alphabet: Alphabet = LATIN,
+) -> None:
+    """Encrypts the UTF-8 file src into dst ("-" is stdin/stdout) chunk_size characters at a time."""
+    transform_text_file(src, dst, lambda chunks: encrypt_caesar_stream(chunks, shift, alphabet), chunk_size)
+
+
+def decrypt_file(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Union[str, pathlib.Path],
+    shift: int = 3,
+    chunk_size: int = CHUNK_SIZE,
+    alphabet: Alphabet = LATIN,
+) -> None:
+    """Decrypts a file written by encrypt_file with the same shift and alphabet."""
+    transform_text_file(src, dst, lambda chunks: encrypt_caesar_stream(chunks, -shift, alphabet), chunk_size)
+
+
+def _mmap_file(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Optional[tp.Union[str, pathlib.Path]],
+    shift: int,
+    alphabet: Alphabet,
+    window: int,
+) -> None:
+    if not alphabet.is_ascii:
+        raise ValueError("Memory-mapped mode supports only ASCII alphabets")
+    # in UTF-8 ASCII bytes never occur inside multibyte characters,
+    # so the file can be shifted byte by byte without decoding it to str
+    letters = "".join(alphabet.cases)
+    table = bytes.maketrans(letters.encode(), letters.translate(alphabet.translation_table(shift)).encode())
+
+    def transform(window_in: memoryview, window_out: memoryview) -> None:
+        window_out[:] = window_in.tobytes().translate(table)
+
+    transform_mapped(src, dst, transform, window)
+
+
+def encrypt_file_mmap(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Optional[tp.Union[str, pathlib.Path]] = None,
+    shift: int = 3,
+    alphabet: Alphabet = LATIN,
+    window: int = WINDOW_SIZE,
+) -> None:
+    """Encrypts a UTF-8 file through mmap, window bytes at a time; without dst the file is changed in place."""
+    _mmap_file(src, dst, shift, alphabet, window)
+
+
+def decrypt_file_mmap(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Optional[tp.Union[str, pathlib.Path]] = None,
+    shift: int = 3,
+    alphabet: Alphabet = LATIN,
+    window: int = WINDOW_SIZE,
+) -> None:
+    """Decrypts a file written by encrypt_file_mmap; without dst the file is changed in place."""
+    _mmap_file(src, dst, -shift, alphabet, window)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caesar cipher, file to file or stdin to stdout")
+    parser.add_argument("mode", choices=["encrypt", "decrypt"])
+    parser.add_argument("--shift", type=int, default=3)
+    parser.add_argument("--alphabet", choices=sorted(ALPHABETS), default="latin")
+    parser.add_argument("src", nargs="?", default="-")
+    parser.add_argument("dst", nargs="?", default="-")
+    args = parser.parse_args()
+    if args.mode == "encrypt":
+        encrypt_file(args.src, args.dst, args.shift, alphabet=ALPHABETS[args.alphabet])
+    else:
+        decrypt_file(args.src, args.dst, args.shift, alphabet=ALPHABETS[args.alphabet])
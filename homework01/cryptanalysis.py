@@ -0,0 +1,129 @@
+import collections
+import time
+import typing as tp
+
+import caesar
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+# Key lengths whose index of coincidence is at least this share of the best one are equal candidates
+IOC_TOLERANCE = 0.9
+# Kasiski repeats are only searched for at the start of the ciphertext
+KASISKI_SAMPLE = 1 << 16
+KASISKI_NGRAM = 3
+
+# Letter positions and numbers: lists without numpy, numpy arrays with it
+Letters = tp.Union[tp.Sequence[int], "np.ndarray"]
+
+
+class VigenereCrackResult(tp.NamedTuple):
+    keyword: str
+    key_length: int
+    index_of_coincidence: float
+    timings: tp.Dict[str, float]
+
+
+def letter_positions(text: str) -> tp.Tuple[Letters, Letters]:
+    """
+    Returns the positions of the Latin letters in text and their numbers 0..25, ignoring case.
+    Positions count every character, because the Vigenere key advances on non-letters too.
+    >>> positions, letters = letter_positions("Ab, c")
+    >>> list(map(int, positions)), list(map(int, letters))
+    ([0, 1, 4], [0, 1, 2])
+    """
+    if np is None:
+        pairs = [(pos, ord(symbol) - ord("A")) for pos, symbol in enumerate(text.upper()) if "A" <= symbol <= "Z"]
+        return [pos for pos, _ in pairs], [letter for _, letter in pairs]
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    upper = codes - ord("A")
+    lower = codes - ord("a")
+    letters = np.where(upper < 26, upper, lower)
+    positions = np.flatnonzero(letters < 26)
+    return positions, letters[positions].astype(np.intp)
+
+
+def column_histograms(positions: Letters, letters: Letters, key_len: int) -> tp.List[tp.List[int]]:
+    """
+    Letter histograms of each of the key_len ciphertext columns, in one pass.
+    >>> column_histograms([0, 1, 2, 3], [0, 1, 0, 2], 2)[1][:3]
+    [0, 1, 1]
+    """
+    if np is None or not isinstance(positions, np.ndarray):
+        histograms = [[0] * 26 for _ in range(key_len)]
+        for pos, letter in zip(positions, letters):
+            histograms[pos % key_len][letter] += 1
+        return histograms
+    flat = np.bincount((positions % key_len) * 26 + letters, minlength=key_len * 26)
+    return flat.reshape(key_len, 26).tolist()
+
+
+def index_of_coincidence(histogram: tp.Sequence[int]) -> float:
+    """
+    Probability that two randomly chosen letters are the same.
+    >>> index_of_coincidence([2, 0, 0])
+    1.0
+    """
+    total = sum(histogram)
+    if total < 2:
+        return 0.0
+    return sum(count * (count - 1) for count in histogram) / (total * (total - 1))
+
+
+def kasiski_scores(ciphertext: str, max_key_len: int) -> tp.Dict[int, float]:
+    """
+    For each key length returns the share of distances between repeated
+    n-grams that are divisible by that length.
+    """
+    last_seen: tp.Dict[str, int] = {}
+    distances: tp.Counter[int] = collections.Counter()
+    sample = ciphertext[:KASISKI_SAMPLE]
+    for pos in range(len(sample) - KASISKI_NGRAM + 1):
+        ngram = sample[pos : pos + KASISKI_NGRAM]
+        if not ngram.isalpha():
+            continue
+        if ngram in last_seen:
+            distances[pos - last_seen[ngram]] += 1
+        last_seen[ngram] = pos
+    total = sum(distances.values())
+    if total == 0:
+        return {key_len: 0.0 for key_len in range(1, max_key_len + 1)}
+    return {
+        key_len: sum(count for distance, count in distances.items() if distance % key_len == 0) / total
+        for key_len in range(1, max_key_len + 1)
+    }
+
+
+def crack_vigenere(ciphertext: str, max_key_len: int = 20) -> VigenereCrackResult:
+    """
+    Recovers the Vigenere keyword of an English ciphertext.
+    The key length is estimated from the index of coincidence of the columns and the
+    Kasiski test, then each key letter is found by frequency analysis as a Caesar shift.
+    """
+    timings = {}
+    start = time.perf_counter()
+    positions, letters = letter_positions(ciphertext)
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    max_key_len = max(1, min(max_key_len, len(positions)))
+    histograms = {key_len: column_histograms(positions, letters, key_len) for key_len in range(1, max_key_len + 1)}
+    ioc = {key_len: sum(map(index_of_coincidence, columns)) / key_len for key_len, columns in histograms.items()}
+    timings["index_of_coincidence"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kasiski = kasiski_scores(ciphertext, max_key_len)
+    timings["kasiski"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # multiples of the true length have a high index of coincidence too, so among the
+    # close candidates the best Kasiski score wins, then the shortest length
+    best_ioc = max(ioc.values())
+    candidates = [key_len for key_len in ioc if ioc[key_len] >= best_ioc * IOC_TOLERANCE]
+    key_len = min(candidates, key=lambda length: (-kasiski[length], length))
+    shifts = [caesar.rank_shifts(column)[0][0] for column in histograms[key_len]]
+    keyword = "".join(chr(ord("A") + shift) for shift in shifts)
+    timings["key"] = time.perf_counter() - start
+    return VigenereCrackResult(keyword, key_len, ioc[key_len], timings)
@@ -0,0 +1,78 @@
+import functools
+import io
+import mmap
+import os
+import pathlib
+import sys
+import typing as tp
+
+# Size of the window processed at a time, bytes
+WINDOW_SIZE = 1 << 24
+# How many characters of a text file are read at a time
+CHUNK_SIZE = 1 << 20
+
+
+def open_text(path: tp.Union[str, pathlib.Path], mode: str) -> tp.TextIO:
+    """Opens a file as UTF-8 without newline translation; "-" means stdin/stdout."""
+    if str(path) == "-":
+        stream = sys.stdin if mode == "r" else sys.stdout
+        return io.TextIOWrapper(stream.buffer, encoding="utf-8", newline="")
+    return tp.cast(tp.TextIO, open(path, mode, encoding="utf-8", newline=""))
+
+
+def transform_text_file(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Union[str, pathlib.Path],
+    transform: tp.Callable[[tp.Iterator[str]], tp.Iterable[str]],
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """
+    Reads src chunk_size characters at a time, passes the stream of chunks to transform
+    and writes what it returns to dst. Memory use does not depend on the file size.
+    """
+    with open_text(src, "r") as fin, open_text(dst, "w") as fout:
+        for block in transform(iter(functools.partial(fin.read, chunk_size), "")):
+            fout.write(block)
+
+
+def transform_mapped(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Optional[tp.Union[str, pathlib.Path]],
+    transform: tp.Callable[[memoryview, memoryview], None],
+    window: int = WINDOW_SIZE,
+) -> None:
+    """
+    Maps src into memory and passes transform one window of window bytes at a time:
+    the window of source data and a window of the same length to write the result to.
+    Without dst the file is changed in place, otherwise dst is created with the same size.
+    Files are never read into memory whole, so they may be larger than RAM.
+    """
+    with open(src, "rb" if dst is not None else "r+b") as fin:
+        size = os.fstat(fin.fileno()).st_size
+        if dst is None:
+            if size:
+                with mmap.mmap(fin.fileno(), 0) as mapped:
+                    _transform_windows(mapped, mapped, size, transform, window)
+            return
+        with open(dst, "w+b") as fout:
+            fout.truncate(size)
+            if not size:
+                return
+            with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mapped_in:
+                with mmap.mmap(fout.fileno(), 0) as mapped_out:
+                    _transform_windows(mapped_in, mapped_out, size, transform, window)
+
+
+def _transform_windows(
+    mapped_in: mmap.mmap,
+    mapped_out: mmap.mmap,
+    size: int,
+    transform: tp.Callable[[memoryview, memoryview], None],
+    window: int,
+) -> None:
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mapped_in.madvise(mmap.MADV_SEQUENTIAL)
+    with memoryview(mapped_in) as view_in, memoryview(mapped_out) as view_out:
+        for start in range(0, size, window):
+            with view_in[start : start + window] as window_in, view_out[start : start + window] as window_out:
+                transform(window_in, window_out)
@@ -1,29 +1,269 @@
+import argparse
+import functools
+import math
+import mmap
+import os
+import pathlib
 import random
+import secrets
+import struct
+import sys
 import typing as tp
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Primes below this bound are found with a sieve at import time
+SMALL_PRIME_LIMIT = 1 << 16
+# is_prime answers from the sieve below this bound, extending it on demand (one byte per two numbers)
+SIEVE_LIMIT = 1 << 24
+# primes_in_range sieves larger ranges in segments of this many numbers
+SEGMENT_SIZE = 1 << 20
+# Miller-Rabin with the first 13 primes as bases is exact for n below this bound (covers 64-bit inputs)
+DETERMINISTIC_LIMIT = 3317044064679887385961981
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+# Random bases for larger n: a composite passes with probability at most 4 ** -rounds
+MILLER_RABIN_ROUNDS = 40
+PUBLIC_EXPONENT = 65537
+# Prime pairs tried by generate_keypair_bits; only tiny keys with an unlucky exponent run out
+KEYPAIR_ATTEMPTS = 1000
+# Reciprocals with fewer bits are computed by plain division
+NEWTON_THRESHOLD = 1 << 14
+
+
+def _sieve_odd(start: int, stop: int, base_primes: tp.Iterable[int]) -> bytearray:
+    """
+    Sieves the odd numbers start, start + 2, ... below stop (start is odd) by odd base_primes,
+    which must include every odd prime up to sqrt(stop). flags[i] is 1 if start + 2i is prime.
+    """
+    count = (stop - start + 1) // 2
+    flags = bytearray(b"\x01") * count
+    if start == 1 and count:
+        flags[0] = 0
+    for p in base_primes:
+        if p * p >= stop:
+            break
+        first = max(p * p, (start + p - 1) // p * p)
+        if first % 2 == 0:
+            first += p
+        index = (first - start) // 2
+        flags[index::p] = bytes(len(range(index, count, p)))
+    return flags
+
+
+class PrimeSieve:
+    """
+    Segmented sieve of Eratosthenes: one byte per odd number below limit.
+    Membership tests are O(1); a query above limit extends the sieve
+    segment by segment (at least doubling it), but never past max_limit.
+    The flags can be saved to a file and memory-mapped back for a fast start.
+    >>> sieve = PrimeSieve(100)
+    >>> 97 in sieve, 91 in sieve, 1009 in sieve
+    (True, False, True)
+    >>> list(sieve.primes(90, 110))
+    [97, 101, 103, 107, 109]
+    """
+
+    __slots__ = ("limit", "max_limit", "_flags")
+
+    def __init__(self, limit: int = SMALL_PRIME_LIMIT, max_limit: int = SIEVE_LIMIT) -> None:
+        self.max_limit = max_limit
+        # flags[i] tells whether 2i + 1 is prime; the sieve starts out covering only 1
+        self.limit = 2
+        self._flags: tp.Union[bytearray, mmap.mmap] = bytearray(1)
+        self.extend(limit)
+
+    def __contains__(self, n: object) -> bool:
+        if not isinstance(n, int) or n < 2:
+            return False
+        if n >= self.limit:
+            if n >= self.max_limit:
+                raise ValueError(f"{n} is beyond the sieve bound {self.max_limit}")
+            self.extend(max(n + 1, 2 * self.limit))
+        return n == 2 or (n % 2 == 1 and self._flags[n // 2] == 1)
+
+    def extend(self, limit: int) -> None:
+        """Sieves all numbers below limit (rounded up to even and capped by max_limit)."""
+        limit = min(limit + limit % 2, self.max_limit)
+        if limit <= self.limit:
+            return
+        root = math.isqrt(limit - 1)
+        if root >= self.limit:
+            self.extend(root + 1)
+        segment = _sieve_odd(self.limit + 1, limit, self.primes(3, root + 1))
+        if not isinstance(self._flags, bytearray):
+            self._flags = bytearray(self._flags)
+        self._flags += segment
+        self.limit = limit
+
+    def primes(self, start: int, stop: int) -> tp.Iterator[int]:
+        """Yields primes p with start <= p < stop in increasing order."""
+        stop = min(stop, self.max_limit)
+        self.extend(stop)
+        if start <= 2 < stop:
+            yield 2
+        flags = self._flags
+        index = flags.find(b"\x01", max(start, 3) // 2, stop // 2)
+        while index != -1:
+            yield 2 * index + 1
+            index = flags.find(b"\x01", index + 1, stop // 2)
+
+    def save(self, path: tp.Union[str, pathlib.Path]) -> None:
+        with open(path, "wb") as f:
+            f.write(self._flags)
+
+    @classmethod
+    def load(cls, path: tp.Union[str, pathlib.Path], max_limit: int = SIEVE_LIMIT) -> "PrimeSieve":
+        """Maps flags written by save into memory without reading the whole file."""
+        sieve = cls(0, max_limit)
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                sieve._flags = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                sieve.limit = 2 * len(sieve._flags)
+        return sieve
+
+
+SIEVE = PrimeSieve()
+SMALL_PRIMES = list(SIEVE.primes(2, SMALL_PRIME_LIMIT))
+# A single gcd with the product of small primes replaces trial division by each of them
+_SMALL_PRIMES_PRODUCT = math.prod(SMALL_PRIMES[:200])
+
+
+def _miller_rabin(n: int, bases: tp.Iterable[int]) -> bool:
+    """Strong probable prime test of odd n > 3 for every base."""
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for base in bases:
+        x = pow(base, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _random_bases(n: int, rounds: int) -> tp.Iterator[int]:
+    # secrets does not touch the state of the random module
+    return (2 + secrets.randbelow(n - 3) for _ in range(rounds))
 
 
 def is_prime(n: int) -> bool:
     """
     Tests to see if a number is prime.
+    Small numbers are looked up in the sieve, the rest go through
+    a small-prime filter and then Miller-Rabin: deterministic for 64-bit
+    inputs and with MILLER_RABIN_ROUNDS random bases above that.
     >>> is_prime(2)
     True
     >>> is_prime(11)
     True
     >>> is_prime(8)
     False
+    >>> is_prime(2 ** 127 - 1)
+    True
     """
-    if n <= 1:
+    if n < SIEVE.max_limit:
+        return n in SIEVE
+    if math.gcd(n, _SMALL_PRIMES_PRODUCT) != 1:
         return False
-    if n <= 3:
-        return True
-    if n % 2 == 0:
-        return False
-    i = 3
-    while i * i <= n:
-        if n % i == 0:
-            return False
-        i += 2
-    return True
+    if n < DETERMINISTIC_LIMIT:
+        return _miller_rabin(n, DETERMINISTIC_BASES)
+    return _miller_rabin(n, _random_bases(n, MILLER_RABIN_ROUNDS))
+
+
+def primes_in_range(a: int, b: int) -> tp.Iterator[int]:
+    """
+    Yields primes p with a <= p < b in increasing order: from SIEVE below its bound,
+    then by sieving [a, b) in segments, and with is_prime once sqrt(b) is beyond the sieve.
+    >>> list(primes_in_range(10, 30))
+    [11, 13, 17, 19, 23, 29]
+    >>> list(primes_in_range(2 ** 40, 2 ** 40 + 50))
+    [1099511627791, 1099511627803]
+    """
+    if a < SIEVE.max_limit:
+        yield from SIEVE.primes(a, b)
+        a = SIEVE.max_limit
+    if a >= b:
+        return
+    root = math.isqrt(b - 1)
+    if root >= SIEVE.max_limit:
+        yield from (n for n in range(a | 1, b, 2) if is_prime(n))
+        return
+    base_primes = list(SIEVE.primes(3, root + 1))
+    for start in range(a | 1, b, SEGMENT_SIZE):
+        flags = _sieve_odd(start, min(start + SEGMENT_SIZE, b), base_primes)
+        index = flags.find(1)
+        while index != -1:
+            yield start + 2 * index
+            index = flags.find(1, index + 1)
+
+
+def _search_window(bits: int) -> int:
+    # primes near 2 ** bits are about bits * ln(2) apart, so a window of 2 * bits odd numbers usually has one
+    return 2 * bits
+
+
+def _sieved_candidates(bits: int) -> tp.Iterator[int]:
+    """
+    Yields odd bits-bit numbers without small prime factors.
+    A random window start + 2k is sieved by SMALL_PRIMES, so Miller-Rabin
+    only runs on the numbers that survive.
+    """
+    while True:
+        # the two top bits are set so that the product of two such primes has exactly 2 * bits bits
+        start = secrets.randbits(bits) | (3 << (bits - 2)) | 1
+        window = _search_window(bits)
+        composite = bytearray(window)
+        for p in SMALL_PRIMES[1:]:
+            if p * p > start:
+                break
+            # start + 2k = 0 (mod p)  <=>  k = -start / 2 (mod p)
+            first = -start * (p + 1) // 2 % p
+            composite[first::p] = b"\x01" * len(range(first, window, p))
+        k = composite.find(0)
+        while k != -1:
+            candidate = start + 2 * k
+            if candidate.bit_length() != bits:
+                break
+            yield candidate
+            k = composite.find(0, k + 1)
+
+
+def generate_prime(bits: int) -> int:
+    """
+    Returns a random prime of exactly bits bits (bits >= 2), using secrets as the source of randomness.
+    >>> generate_prime(512).bit_length()
+    512
+    >>> is_prime(generate_prime(64))
+    True
+    """
+    if bits < 2:
+        raise ValueError("A prime has at least 2 bits")
+    for candidate in _sieved_candidates(bits):
+        if candidate < DETERMINISTIC_LIMIT:
+            if is_prime(candidate):
+                return candidate
+        elif _miller_rabin(candidate, _random_bases(candidate, _generation_rounds(bits))):
+            return candidate
+    raise AssertionError("unreachable")
+
+
+def _generation_rounds(bits: int) -> int:
+    """
+    Miller-Rabin rounds for a random candidate to reach error below 2 ** -100
+    (FIPS 186-4, table C.2); random candidates need far fewer rounds than
+    adversarial input.
+    """
+    if bits >= 1536:
+        return 4
+    if bits >= 1024:
+        return 5
+    if bits >= 512:
+        return 7
+    return MILLER_RABIN_ROUNDS
 
 
 def gcd(a: int, b: int) -> int:
@@ -42,6 +282,90 @@ def gcd(a: int, b: int) -> int:
     return a
 
 
+def _product_tree(values: tp.List[int]) -> tp.List[tp.List[int]]:
+    """Levels from values up to their product, each level multiplies neighbours of the previous one."""
+    tree = [values]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        tree.append([math.prod(level[i : i + 2]) for i in range(0, len(level), 2)])
+    return tree
+
+
+def _reciprocal(d: int, k: int) -> int:
+    """
+    floor(2 ** k / d) for d > 0. CPython divides big integers in quadratic time,
+    so long results are refined by Newton's iteration, which only multiplies.
+    >>> _reciprocal(3 ** 5000, 20000) == (1 << 20000) // 3 ** 5000
+    True
+    """
+    n = d.bit_length()
+    # bits of the result still to be found at half precision, plus a margin for the approximation error
+    half = (k - n) // 2 + 32
+    if k - n < NEWTON_THRESHOLD or n <= half:
+        return (1 << k) // d
+    shift = n - half
+    x = _reciprocal(d >> shift, 2 * half) << (k - shift - 2 * half)
+    x += x * ((1 << k) - d * x) >> k
+    remainder = (1 << k) - d * x
+    while remainder < 0:
+        x, remainder = x - 1, remainder + d
+    while remainder >= d:
+        x, remainder = x + 1, remainder - d
+    return x
+
+
+def batch_gcd(moduli: tp.Iterable[int]) -> tp.List[int]:
+    """
+    Bernstein's batch GCD: for every modulus returns its gcd with the product of all
+    the others, in quasi-linear time instead of gcd over every pair. A result other
+    than 1 means the modulus shares a prime with another one (or is repeated).
+    >>> batch_gcd([3 * 5, 3 * 7, 7 * 11, 13 * 17])
+    [3, 21, 7, 1]
+    """
+    moduli = list(moduli)
+    if not moduli:
+        return []
+    tree = _product_tree(moduli)
+    # P mod n ** 2 comes from a scaled remainder tree: every node keeps frac(P / node ** 2) as an
+    # integer scaled by 2 ** precision, and a child gets frac(parent fraction * sibling ** 2),
+    # so going down the tree needs only multiplications; every level may lose about 2 bits
+    guard = 2 * len(tree) + 8
+    root = tree.pop()[0]
+    squares = [root * root]
+    # P / P ** 2 = 1 / P
+    scaled = [_reciprocal(root, squares[0].bit_length() + guard)]
+    while tree:
+        child_squares = [value * value for value in tree.pop()]
+        child_scaled = []
+        for i, square in enumerate(child_squares):
+            precision = squares[i // 2].bit_length() + guard
+            fraction = scaled[i // 2]
+            if i ^ 1 < len(child_squares):
+                fraction = fraction * child_squares[i ^ 1] & ((1 << precision) - 1)
+            child_scaled.append(fraction >> (precision - square.bit_length() - guard))
+        squares, scaled = child_squares, child_scaled
+    result = []
+    for n, square, fraction in zip(moduli, squares, scaled):
+        precision = square.bit_length() + guard
+        remainder = ((fraction * square + (1 << (precision - 1))) >> precision) % square
+        result.append(gcd(remainder // n, n))
+    return result
+
+
+def extended_gcd(a: int, b: int) -> tp.Tuple[int, int, int]:
+    """
+    Iterative extended Euclid: returns (g, x, y) such that a * x + b * y = g = gcd(a, b).
+    >>> extended_gcd(7, 40)
+    (1, -17, 3)
+    """
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b != 0:
+        quotient, (a, b) = a // b, (b, a % b)
+        x0, x1 = x1, x0 - quotient * x1
+        y0, y1 = y1, y0 - quotient * y1
+    return a, x0, y0
+
+
 def multiplicative_inverse(e: int, phi: int) -> int:
     """
     Euclid's extended algorithm for finding the multiplicative
@@ -49,19 +373,71 @@ def multiplicative_inverse(e: int, phi: int) -> int:
     >>> multiplicative_inverse(7, 40)
     23
     """
-    def extended_gcd(x: int, y: int):
-        if y == 0:
-            return x, 1, 0
-        g, s, t = extended_gcd(y, x % y)
-        return g, t, s - (x // y) * t
-
     g, x, _ = extended_gcd(e, phi)
     if g != 1:
         return 0
     return x % phi
 
 
-def generate_keypair(p: int, q: int) -> tp.Tuple[tp.Tuple[int, int], tp.Tuple[int, int]]:
+def batch_inverse(values: tp.Iterable[int], modulus: int) -> tp.List[int]:
+    """
+    Inverts all values modulo modulus with Montgomery's trick: one inversion
+    of the product plus 3(n - 1) multiplications. Like multiplicative_inverse,
+    returns 0 for values that have no inverse.
+    >>> batch_inverse([7, 3, 9], 40)
+    [23, 27, 9]
+    >>> batch_inverse([7, 4, 9], 40)
+    [23, 0, 9]
+    """
+    values = list(values)
+    if not values:
+        return []
+    prefix = []
+    product = 1
+    for value in values:
+        product = product * value % modulus
+        prefix.append(product)
+    if gcd(product, modulus) != 1:
+        # some value is not invertible, and then neither is the product
+        return [multiplicative_inverse(value, modulus) for value in values]
+    inverse = multiplicative_inverse(product, modulus)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        # inverse is now (values[0] * ... * values[i]) ** -1
+        result[i] = inverse * prefix[i - 1] % modulus
+        inverse = inverse * values[i] % modulus
+    result[0] = inverse
+    return result
+
+
+def choose_public_exponent(phi: int, preferred: int = PUBLIC_EXPONENT) -> int:
+    """
+    Returns preferred if it is coprime with phi and below it, otherwise the smallest
+    odd prime that is. A small prime e keeps encryption to a few multiplications:
+    65537 = 2 ** 16 + 1 takes 16 squarings and one multiply.
+    >>> choose_public_exponent((1229 - 1) * (1381 - 1))
+    65537
+    >>> choose_public_exponent((17 - 1) * (19 - 1))
+    5
+    """
+    if 1 < preferred < phi and gcd(preferred, phi) == 1:
+        return preferred
+    for e in primes_in_range(3, phi):
+        if gcd(e, phi) == 1:
+            return e
+    # only phi = 2 (p, q = 2, 3) gets here, and 1 is its only unit
+    return 1
+
+
+def generate_keypair(
+    p: int, q: int, exponent: tp.Optional[int] = PUBLIC_EXPONENT
+) -> tp.Tuple[tp.Tuple[int, int], tp.Tuple[int, int]]:
+    """
+    The public exponent is chosen by choose_public_exponent(phi, exponent);
+    exponent=None keeps the old behaviour of a random e coprime with phi.
+    >>> generate_keypair(1229, 1381)
+    ((65537, 1697249), (1395233, 1697249))
+    """
     if not (is_prime(p) and is_prime(q)):
         raise ValueError("Both numbers must be prime.")
     elif p == q:
@@ -73,14 +449,17 @@ def generate_keypair(p: int, q: int) -> tp.Tuple[tp.Tuple[int, int], tp.Tuple[in
     # phi = (p-1)(q-1)
     phi = (p - 1) * (q - 1)
 
-    # Choose an integer e such that e and phi(n) are coprime
-    e = random.randrange(1, phi)
-
-    # Use Euclid's Algorithm to verify that e and phi(n) are coprime
-    g = gcd(e, phi)
-    while g != 1:
+    if exponent is not None:
+        e = choose_public_exponent(phi, exponent)
+    else:
+        # Choose an integer e such that e and phi(n) are coprime
         e = random.randrange(1, phi)
+
+        # Use Euclid's Algorithm to verify that e and phi(n) are coprime
         g = gcd(e, phi)
+        while g != 1:
+            e = random.randrange(1, phi)
+            g = gcd(e, phi)
 
     # Use Extended Euclid's Algorithm to generate the private key
     d = multiplicative_inverse(e, phi)
@@ -90,36 +469,427 @@ def generate_keypair(p: int, q: int) -> tp.Tuple[tp.Tuple[int, int], tp.Tuple[in
     return ((e, n), (d, n))
 
 
-def encrypt(pk: tp.Tuple[int, int], plaintext: str) -> tp.List[int]:
-    # Unpack the key into it's components
-    key, n = pk
+def generate_keypair_bits(bits: int, exponent: int = PUBLIC_EXPONENT) -> tp.Tuple["PublicKey", "PrivateKey"]:
+    """
+    Generates a keypair with a modulus of exactly bits bits from two random primes.
+    >>> public, private = generate_keypair_bits(512)
+    >>> public[0], public[1].bit_length(), decrypt(private, encrypt(public, "RSA"))
+    (65537, 512, 'RSA')
+    """
+    # below 10 bits there are too few primes of the right size to pick two distinct ones
+    if bits < 10:
+        raise ValueError("Key size must be at least 10 bits")
+    # an even exponent is never coprime with p - 1, so the loop below would not end
+    if exponent <= 1 or exponent % 2 == 0:
+        raise ValueError("Public exponent must be odd and greater than 1")
+    for _ in range(KEYPAIR_ATTEMPTS):
+        p = generate_prime(bits - bits // 2)
+        q = generate_prime(bits // 2)
+        # e must be invertible modulo phi = (p - 1)(q - 1)
+        if p != q and gcd(exponent, p - 1) == 1 and gcd(exponent, q - 1) == 1:
+            break
+    else:
+        raise ValueError(f"No two distinct {bits // 2}-bit primes found that suit exponent {exponent}")
+    d = multiplicative_inverse(exponent, (p - 1) * (q - 1))
+    return PublicKey(exponent, p * q), PrivateKey(p, q, d)
+
+
+def generate_keypairs(
+    count: int, bits: int, workers: tp.Optional[int] = None, exponent: int = PUBLIC_EXPONENT
+) -> tp.Iterator[tp.Tuple["PublicKey", "PrivateKey"]]:
+    """
+    Generates count keypairs in a pool of workers processes (all cores by default)
+    and yields each one as soon as it is ready, so the order is arbitrary.
+    Every process draws its primes from secrets, i.e. from the OS generator.
+    >>> sorted(public[1].bit_length() for public, _ in generate_keypairs(3, 128, workers=2))
+    [128, 128, 128]
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for _ in range(count):
+            yield generate_keypair_bits(bits, exponent)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # only a few tasks per process are queued, so a huge count does not create all futures at once
+        pending: tp.Set[tp.Any] = set()
+        submitted = 0
+        try:
+            while submitted < count or pending:
+                while submitted < count and len(pending) < 2 * workers:
+                    pending.add(executor.submit(generate_keypair_bits, bits, exponent))
+                    submitted += 1
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class CachedKey:
+    """
+    Key (exponent, n) that keeps what is derived from n, so that one key object
+    can process many messages without recomputing it. as_key wraps tuple keys
+    in it; PublicKey and PrivateKey extend it.
+    Unpacks and indexes like the tuple key: exponent, n = CachedKey(exponent, n).
+    >>> key = CachedKey(121, 323)
+    >>> tuple(key), key[1], key.bits
+    ((121, 323), 323, 9)
+    """
+
+    __slots__ = ("exponent", "n", "bits", "_sizes")
+
+    def __init__(self, exponent: int, n: int) -> None:
+        self.exponent = exponent
+        self.n = n
+        self.bits = n.bit_length()
+        self._sizes: tp.Optional[tp.Tuple[int, int]] = None
+
+    def __iter__(self) -> tp.Iterator[int]:
+        return iter((self.exponent, self.n))
+
+    def __getitem__(self, index: int) -> int:
+        return (self.exponent, self.n)[index]
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is type(self):
+            return tuple(self) == tuple(tp.cast(CachedKey, other))
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.exponent, self.n))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(exponent={self.exponent}, n={self.n})"
+
+    @property
+    def sizes(self) -> tp.Tuple[int, int]:
+        """block_sizes(n), computed on first use."""
+        if self._sizes is None:
+            self._sizes = block_sizes(self.n)
+        return self._sizes
+
+    def power(self, value: int) -> int:
+        return pow(value, self.exponent, self.n)
+
+
+class PublicKey(CachedKey):
+    """
+    Public key (e, n).
+    >>> key = PublicKey(121, 323)
+    >>> key, key.e
+    (PublicKey(e=121, n=323), 121)
+    """
+
+    __slots__ = ()
+
+    @property
+    def e(self) -> int:
+        return self.exponent
+
+    def __repr__(self) -> str:
+        return f"PublicKey(e={self.e}, n={self.n})"
+
+
+class PrivateKey(CachedKey):
+    """
+    Private key (d, n) that also keeps the factors of n, so that
+    exponentiation uses the Chinese remainder theorem: two exponents and
+    moduli of half the size make it about 4 times faster than pow(c, d, n).
+    Unpacks like the tuple key: d, n = PrivateKey(p, q, d).
+    >>> key = PrivateKey(17, 19, 169)
+    >>> tuple(key)
+    (169, 323)
+    >>> key.power(42) == pow(42, 169, 323)
+    True
+    """
+
+    __slots__ = ("p", "q", "dp", "dq", "qinv")
+
+    def __init__(self, p: int, q: int, d: int) -> None:
+        if p == q:
+            raise ValueError("p and q cannot be equal")
+        super().__init__(d, p * q)
+        self.p, self.q = p, q
+        self.dp = d % (p - 1)
+        self.dq = d % (q - 1)
+        self.qinv = multiplicative_inverse(q, p)
+
+    @property
+    def d(self) -> int:
+        return self.exponent
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PrivateKey):
+            return (self.d, self.p, self.q) == (other.d, other.p, other.q)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.d, self.p, self.q))
+
+    def __repr__(self) -> str:
+        return f"PrivateKey(p={self.p}, q={self.q}, d={self.d})"
+
+    def power(self, value: int) -> int:
+        """Computes value ** d mod n via CRT (Garner's recombination)."""
+        m_p = pow(value, self.dp, self.p)
+        m_q = pow(value, self.dq, self.q)
+        h = self.qinv * (m_p - m_q) % self.p
+        return m_q + h * self.q
+
+
+Key = tp.Union[tp.Tuple[int, int], CachedKey]
+
+
+def as_key(pk: Key) -> CachedKey:
+    """
+    Returns a key object with cached block sizes. A tuple key may be public or private,
+    so it becomes a plain CachedKey; without the factors of n there is nothing else to precompute.
+    """
+    if isinstance(pk, CachedKey):
+        return pk
+    exponent, n = pk
+    return CachedKey(exponent, n)
+
+
+def _power(key: Key, value: int) -> int:
+    if isinstance(key, CachedKey):
+        return key.power(value)
+    exponent, n = key
+    return pow(value, exponent, n)
+
+
+def _sizes(key: Key) -> tp.Tuple[int, int]:
+    if isinstance(key, CachedKey):
+        return key.sizes
+    return block_sizes(key[1])
+
+
+def encrypt(pk: Key, plaintext: str) -> tp.List[int]:
+    """
+    >>> encrypt((121, 323), "Hi")
+    [276, 184]
+    """
     # Convert each letter in the plaintext to numbers based on
-    # the character using a^b mod m
-    cipher = [(ord(char) ** key) % n for char in plaintext]
-    # Return the array of bytes
-    return cipher
+    # the character using a^b mod m (never building a^b itself)
+    return [_power(pk, ord(char)) for char in plaintext]
 
 
-def decrypt(pk: tp.Tuple[int, int], ciphertext: tp.List[int]) -> str:
-    # Unpack the key into its components
-    key, n = pk
+def decrypt(pk: Key, ciphertext: tp.List[int]) -> str:
+    """
+    >>> decrypt(PrivateKey(17, 19, 169), [276, 184])
+    'Hi'
+    """
     # Generate the plaintext based on the ciphertext and key using a^b mod m
-    plain = [chr((char ** key) % n) for char in ciphertext]
-    # Return the array of bytes as a string
-    return "".join(plain)
+    return "".join(chr(_power(pk, char)) for char in ciphertext)
+
+
+# Every block starts with this byte, so leading zero bytes of the payload survive the round trip
+BLOCK_MARKER = b"\x01"
+
+
+def block_sizes(n: int) -> tp.Tuple[int, int]:
+    """
+    Returns (payload, block): how many message bytes fit into one block
+    and how many bytes an encrypted block takes for the modulus n.
+    >>> block_sizes(2 ** 2047 + 1)
+    (254, 256)
+    """
+    block = (n.bit_length() + 7) // 8
+    # marker + payload is at most block - 1 bytes, i.e. below 2 ** (8 * (block - 1)) <= n
+    payload = block - 1 - len(BLOCK_MARKER)
+    if payload < 1:
+        raise ValueError("Modulus is too small for block mode")
+    return payload, block
+
+
+def _encrypt_block(pk: Key, data: bytes, block: int) -> bytes:
+    return _power(pk, int.from_bytes(BLOCK_MARKER + data, "big")).to_bytes(block, "big")
+
+
+def _decrypt_block(pk: Key, data: bytes) -> bytes:
+    value = _power(pk, int.from_bytes(data, "big"))
+    padded = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    if not padded.startswith(BLOCK_MARKER):
+        raise ValueError("Invalid block padding")
+    return padded[len(BLOCK_MARKER) :]
+
+
+def _regroup(chunks: tp.Iterable[bytes], size: int) -> tp.Iterator[bytes]:
+    """Cuts a stream of chunks of any length into pieces of size bytes; the last one may be shorter."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        whole = len(buffer) - len(buffer) % size
+        for start in range(0, whole, size):
+            yield bytes(buffer[start : start + size])
+        del buffer[:whole]
+    if buffer:
+        yield bytes(buffer)
+
+
+def encrypt_stream(pk: Key, chunks: tp.Iterable[bytes]) -> tp.Iterator[bytes]:
+    """
+    Encrypts a stream of byte chunks of any length and yields one encrypted
+    fixed-size block per block_sizes(n)[0] bytes of input; memory use
+    does not depend on the length of the stream.
+    >>> [len(block) for block in encrypt_stream((142169, 1697249), [b"abc", b"de"])]
+    [3, 3, 3, 3, 3]
+    """
+    payload, block = _sizes(pk)
+    for data in _regroup(chunks, payload):
+        yield _encrypt_block(pk, data, block)
+
+
+def decrypt_stream(pk: Key, chunks: tp.Iterable[bytes]) -> tp.Iterator[bytes]:
+    """
+    Decrypts a stream of encrypted blocks, split into chunks of any length,
+    and yields the plaintext of each block.
+    >>> key = PrivateKey(1229, 1381, 734969)
+    >>> b"".join(decrypt_stream(key, encrypt_stream((142169, 1697249), [b"abc", b"de"])))
+    b'abcde'
+    """
+    _, block = _sizes(pk)
+    for data in _regroup(chunks, block):
+        if len(data) != block:
+            raise ValueError(f"Ciphertext length must be a multiple of {block} bytes")
+        yield _decrypt_block(pk, data)
+
+
+def encrypt_blocks(pk: Key, plaintext: str) -> bytes:
+    """
+    Encrypts the UTF-8 bytes of plaintext with one exponentiation per block
+    of block_sizes(n)[0] bytes; the result is a sequence of fixed-size blocks.
+    >>> ciphertext = encrypt_blocks((142169, 1697249), "Hi!")
+    >>> len(ciphertext), decrypt_blocks(PrivateKey(1229, 1381, 734969), ciphertext)
+    (9, 'Hi!')
+    """
+    payload, block = _sizes(pk)
+    data = plaintext.encode("utf-8")
+    return b"".join(_encrypt_block(pk, data[start : start + payload], block) for start in range(0, len(data), payload))
+
+
+def decrypt_blocks(pk: Key, ciphertext: bytes) -> str:
+    """Decrypts the output of encrypt_blocks."""
+    _, block = _sizes(pk)
+    if len(ciphertext) % block:
+        raise ValueError(f"Ciphertext length must be a multiple of {block} bytes")
+    blocks = (ciphertext[start : start + block] for start in range(0, len(ciphertext), block))
+    return b"".join(_decrypt_block(pk, data) for data in blocks).decode("utf-8")
+
+
+def encrypt_many(pk: Key, messages: tp.Iterable[str]) -> tp.List[bytes]:
+    """
+    Encrypts every message with encrypt_blocks, preparing the key only once.
+    >>> len(encrypt_many((142169, 1697249), ["Hi", "RSA"]))
+    2
+    """
+    key = as_key(pk)
+    return [encrypt_blocks(key, message) for message in messages]
+
+
+def decrypt_many(pk: Key, ciphertexts: tp.Iterable[bytes]) -> tp.List[str]:
+    """
+    Decrypts every output of encrypt_blocks, preparing the key only once.
+    >>> decrypt_many(PrivateKey(1229, 1381, 734969), encrypt_many((142169, 1697249), ["Hi", "RSA"]))
+    ['Hi', 'RSA']
+    """
+    key = as_key(pk)
+    return [decrypt_blocks(key, ciphertext) for ciphertext in ciphertexts]
+
+
+# Framed file: FILE_MAGIC, then every encrypted block prefixed with its length
+FILE_MAGIC = b"RSA\x01"
+FRAME_HEADER = struct.Struct(">I")
+CHUNK_SIZE = 1 << 20
+
+
+def _open_binary(path: tp.Union[str, pathlib.Path], mode: str) -> tp.BinaryIO:
+    """Opens a file in binary mode, "-" means stdin/stdout."""
+    if str(path) == "-":
+        stream = sys.stdin if mode == "rb" else sys.stdout
+        return tp.cast(tp.BinaryIO, open(stream.fileno(), mode, closefd=False))
+    return tp.cast(tp.BinaryIO, open(path, mode))
+
+
+def write_frames(blocks: tp.Iterable[bytes], fout: tp.BinaryIO) -> None:
+    fout.write(FILE_MAGIC)
+    for block in blocks:
+        fout.write(FRAME_HEADER.pack(len(block)))
+        fout.write(block)
+
+
+def read_frames(fin: tp.BinaryIO) -> tp.Iterator[bytes]:
+    if fin.read(len(FILE_MAGIC)) != FILE_MAGIC:
+        raise ValueError("Not an RSA framed file")
+    while header := fin.read(FRAME_HEADER.size):
+        if len(header) != FRAME_HEADER.size:
+            raise ValueError("Truncated frame header")
+        (length,) = FRAME_HEADER.unpack(header)
+        block = fin.read(length)
+        if len(block) != length:
+            raise ValueError("Truncated frame")
+        yield block
+
+
+def encrypt_file(
+    pk: Key, src: tp.Union[str, pathlib.Path], dst: tp.Union[str, pathlib.Path], chunk_size: int = CHUNK_SIZE
+) -> None:
+    """Encrypts src into a framed file dst reading chunk_size bytes at a time."""
+    with _open_binary(src, "rb") as fin, _open_binary(dst, "wb") as fout:
+        write_frames(encrypt_stream(pk, iter(functools.partial(fin.read, chunk_size), b"")), fout)
+
+
+def decrypt_file(pk: Key, src: tp.Union[str, pathlib.Path], dst: tp.Union[str, pathlib.Path]) -> None:
+    """Decrypts a framed file src written by encrypt_file into dst."""
+    with _open_binary(src, "rb") as fin, _open_binary(dst, "wb") as fout:
+        for data in decrypt_stream(pk, read_frames(fin)):
+            fout.write(data)
+
+
+def save_key(key: Key, path: tp.Union[str, pathlib.Path]) -> None:
+    """
+    Writes a key as text: "e n" for a public key, "p q d" for a PrivateKey.
+    A PrivateKey file is readable by its owner only (mode 0o600).
+    """
+    if not isinstance(key, PrivateKey):
+        pathlib.Path(path).write_text(" ".join(map(str, key)) + "\n")
+        return
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    if hasattr(os, "fchmod"):
+        # O_CREAT applies the mode only to a new file, an existing one keeps its permissions
+        os.fchmod(fd, 0o600)
+    with open(fd, "w") as f:
+        f.write(f"{key.p} {key.q} {key.d}\n")
+
+
+def load_key(path: tp.Union[str, pathlib.Path]) -> Key:
+    numbers = [int(number) for number in pathlib.Path(path).read_text().split()]
+    if len(numbers) == 3:
+        return PrivateKey(*numbers)
+    if len(numbers) == 2:
+        return PublicKey(*numbers)
+    raise ValueError(f"{path} is not a key file")
 
 
 if __name__ == "__main__":
-    print("RSA Encrypter/ Decrypter")
-    p = int(input("Enter a prime number (17, 19, 23, etc): "))
-    q = int(input("Enter another prime number (Not one you entered above): "))
-    print("Generating your public/private keypairs now . . .")
-    public, private = generate_keypair(p, q)
-    print("Your public key is ", public, " and your private key is ", private)
-    message = input("Enter a message to encrypt with your private key: ")
-    encrypted_msg = encrypt(private, message)
-    print("Your encrypted message is: ")
-    print("".join(map(lambda x: str(x), encrypted_msg)))
-    print("Decrypting message with public key ", public, " . . .")
-    print("Your message is:")
-    print(decrypt(public, encrypted_msg))
+    parser = argparse.ArgumentParser(description="RSA block encryption of files, file to file or stdin to stdout")
+    commands = parser.add_subparsers(dest="command", required=True)
+    genkey = commands.add_parser("genkey", help="generate a keypair")
+    genkey.add_argument("public")
+    genkey.add_argument("private")
+    genkey.add_argument("--bits", type=int, default=2048)
+    for command in ("encrypt", "decrypt"):
+        subparser = commands.add_parser(command, help=f"{command} a file")
+        subparser.add_argument("key")
+        subparser.add_argument("src", nargs="?", default="-")
+        subparser.add_argument("dst", nargs="?", default="-")
+    args = parser.parse_args()
+    if args.command == "genkey":
+        public, private = generate_keypair_bits(args.bits)
+        save_key(public, args.public)
+        save_key(private, args.private)
+    elif args.command == "encrypt":
+        encrypt_file(load_key(args.key), args.src, args.dst)
+    else:
+        decrypt_file(load_key(args.key), args.src, args.dst)
@@ -0,0 +1,31 @@
+import string
+import unittest
+
+from alphabet import CYRILLIC, LATIN, Alphabet
+
+
+class AlphabetTestCase(unittest.TestCase):
+    def test_position(self):
+        self.assertEqual(0, LATIN.position("a"))
+        self.assertEqual(25, LATIN.position("Z"))
+        self.assertEqual(6, CYRILLIC.position("Ё"))
+        self.assertEqual(32, CYRILLIC.position("я"))
+        with self.assertRaises(ValueError):
+            LATIN.position("я")
+
+    def test_translation_table(self):
+        self.assertEqual("BCDA", "ABCD".translate(Alphabet("ABCD").translation_table(1)))
+        self.assertEqual("xyzabc", "abcdef".translate(LATIN.translation_table(-3)))
+        self.assertEqual(LATIN.translation_table(3), LATIN.translation_table(29))
+
+    def test_equality(self):
+        self.assertEqual(LATIN, Alphabet(string.ascii_uppercase, string.ascii_lowercase))
+        self.assertNotEqual(LATIN, CYRILLIC)
+        self.assertTrue(LATIN.is_ascii)
+        self.assertFalse(CYRILLIC.is_ascii)
+
+    def test_invalid(self):
+        for cases in ((), ("",), ("ABC", "ab"), ("ABA",)):
+            with self.subTest(cases=cases):
+                with self.assertRaises(ValueError):
+                    Alphabet(*cases)
@@ -1,8 +1,11 @@
+import os
 import random
 import string
+import tempfile
 import unittest
 
 import caesar
+from alphabet import CYRILLIC
 
 
 class CaesarTestCase(unittest.TestCase):
@@ -51,3 +54,79 @@ class CaesarTestCase(unittest.TestCase):
             caesar.decrypt_caesar(ciphertext, shift=shift),
             msg=f"shift={shift}, ciphertext={ciphertext}",
         )
+
+    def test_non_ascii_letters_untouched(self):
+        self.assertEqual("Ёжик é Cc", caesar.encrypt_caesar("Ёжик é Zz", shift=3))
+        self.assertEqual("Ёжик é Zz", caesar.decrypt_caesar("Ёжик é Cc", shift=3))
+
+    def test_shift_is_modular(self):
+        self.assertEqual(caesar.encrypt_caesar("Python", shift=3), caesar.encrypt_caesar("Python", shift=29))
+        self.assertEqual(caesar.encrypt_caesar("Python", shift=-23), caesar.encrypt_caesar("Python", shift=3))
+
+    def test_stream_matches_one_shot(self):
+        plaintext = "".join(random.choice(string.ascii_letters + " -,\n") for _ in range(1000))
+        chunks = [plaintext[i : i + 7] for i in range(0, len(plaintext), 7)]
+        self.assertEqual(caesar.encrypt_caesar(plaintext, 5), "".join(caesar.encrypt_caesar_stream(chunks, 5)))
+
+    def test_file_roundtrip(self):
+        plaintext = "Python 3.6\r\nЁж\n" * 100
+        with tempfile.TemporaryDirectory() as tmp:
+            src, enc, dec = (os.path.join(tmp, name) for name in ("src", "enc", "dec"))
+            with open(src, "w", encoding="utf-8", newline="") as f:
+                f.write(plaintext)
+            caesar.encrypt_file(src, enc, shift=5, chunk_size=13)
+            caesar.decrypt_file(enc, dec, shift=5, chunk_size=64)
+            with open(enc, encoding="utf-8", newline="") as f:
+                self.assertEqual(caesar.encrypt_caesar(plaintext, 5), f.read())
+            with open(dec, encoding="utf-8", newline="") as f:
+                self.assertEqual(plaintext, f.read())
+
+    def test_file_mmap(self):
+        plaintext = "Python 3.6\r\nЁж\n" * 100
+        with tempfile.TemporaryDirectory() as tmp:
+            src, enc = os.path.join(tmp, "src"), os.path.join(tmp, "enc")
+            with open(src, "w", encoding="utf-8", newline="") as f:
+                f.write(plaintext)
+            caesar.encrypt_file_mmap(src, enc, shift=5, window=13)
+            with open(enc, encoding="utf-8", newline="") as f:
+                self.assertEqual(caesar.encrypt_caesar(plaintext, 5), f.read())
+            caesar.decrypt_file_mmap(enc, shift=5)
+            with open(enc, encoding="utf-8", newline="") as f:
+                self.assertEqual(plaintext, f.read())
+            with self.assertRaises(ValueError):
+                caesar.encrypt_file_mmap(src, enc, alphabet=CYRILLIC)
+
+    def test_crack(self):
+        plaintext = (
+            "It was the best of times, it was the worst of times, it was the age of wisdom, "
+            "it was the age of foolishness, it was the epoch of belief, it was the epoch of incredulity."
+        )
+        for shift in (0, 1, 13, 25):
+            with self.subTest(shift=shift):
+                candidates = caesar.crack_caesar(caesar.encrypt_caesar(plaintext, shift))
+                self.assertEqual(26, len(candidates))
+                self.assertEqual(shift, candidates[0].shift)
+                self.assertGreater(candidates[0].confidence, 0.99)
+                self.assertAlmostEqual(1.0, sum(candidate.confidence for candidate in candidates))
+
+    def test_crack_sample(self):
+        ciphertext = caesar.encrypt_caesar("the quick brown fox jumps over the lazy dog " * 50, 7) + "Q" * 10000
+        self.assertEqual(7, caesar.crack_caesar(ciphertext, sample_size=2000)[0].shift)
+
+    def test_batch(self):
+        messages = ["".join(random.choice(string.ascii_letters + "Ё ") for _ in range(16)) for _ in range(100)]
+        shifts = [random.randint(0, 25) for _ in messages]
+        expected = [caesar.encrypt_caesar(m, 5) for m in messages]
+        self.assertEqual(expected, caesar.encrypt_caesar_batch(messages, 5))
+        expected = [caesar.encrypt_caesar(m, shift) for m, shift in zip(messages, shifts)]
+        self.assertEqual(expected, caesar.encrypt_caesar_batch(iter(messages), iter(shifts)))
+        self.assertEqual(messages, caesar.decrypt_caesar_batch(expected, shifts))
+        self.assertEqual(["b\x00c", "", "d"], caesar.encrypt_caesar_batch(["a\x00b", "", "c"], 1))
+        self.assertEqual([], caesar.encrypt_caesar_batch([], 1))
+        with self.assertRaises(ValueError):
+            caesar.encrypt_caesar_batch(messages, [1, 2])
+
+    def test_cyrillic(self):
+        self.assertEqual("Тулезх, Аб!", caesar.encrypt_caesar("Привет, Эю!", 3, CYRILLIC))
+        self.assertEqual("Привет, Эю!", caesar.decrypt_caesar("Тулезх, Аб!", 3, CYRILLIC))
+        self.assertEqual("Hello", caesar.encrypt_caesar("Hello", 5, CYRILLIC))
@@ -0,0 +1,41 @@
+import unittest
+
+import cryptanalysis
+import vigenere
+
+TEXT = (
+    "It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of "
+    "foolishness, it was the epoch of belief, it was the epoch of incredulity, it was the season of Light, "
+    "it was the season of Darkness, it was the spring of hope, it was the winter of despair, we had "
+    "everything before us, we had nothing before us, we were all going direct to Heaven, we were all going "
+    "direct the other way - in short, the period was so far like the present period, that some of its "
+    "noisiest authorities insisted on its being received, for good or for evil, in the superlative degree "
+    "of comparison only. There were a king with a large jaw and a queen with a plain face, on the throne of "
+    "England; there were a king with a large jaw and a queen with a fair face, on the throne of France."
+)
+
+
+class CryptanalysisTestCase(unittest.TestCase):
+    def test_crack_vigenere(self):
+        for keyword in ("A", "KEY", "LEMON", "CRYPTANALYSIS"):
+            with self.subTest(keyword=keyword):
+                ciphertext = vigenere.encrypt_vigenere(TEXT.upper(), keyword)
+                result = cryptanalysis.crack_vigenere(ciphertext)
+                self.assertEqual(len(keyword), result.key_length)
+                self.assertEqual(keyword, result.keyword)
+                self.assertEqual(TEXT.upper(), vigenere.decrypt_vigenere(ciphertext, result.keyword))
+
+    def test_crack_vigenere_mixed_case(self):
+        ciphertext = vigenere.encrypt_vigenere(TEXT, "lemon")
+        self.assertEqual("LEMON", cryptanalysis.crack_vigenere(ciphertext).keyword)
+
+    def test_timings(self):
+        result = cryptanalysis.crack_vigenere(vigenere.encrypt_vigenere(TEXT.upper(), "KEY"))
+        self.assertEqual({"parse", "index_of_coincidence", "kasiski", "key"}, set(result.timings))
+
+    def test_column_histograms(self):
+        positions, letters = cryptanalysis.letter_positions("ab-cd")
+        histograms = cryptanalysis.column_histograms(positions, letters, 2)
+        self.assertEqual([1, 0, 0, 1], histograms[0][:4])
+        self.assertEqual([0, 1, 1, 0], histograms[1][:4])
+        self.assertEqual(histograms, cryptanalysis.column_histograms(list(positions), list(letters), 2))
@@ -1,4 +1,9 @@
+import doctest
+import io
+import math
+import os
 import random
+import tempfile
 import unittest
 
 import rsa
@@ -18,6 +23,44 @@ class RSATestCase(unittest.TestCase):
         self.assertFalse(rsa.is_prime(8))
         self.assertTrue(rsa.is_prime(3571))
 
+    def test_is_prime_large(self):
+        trial = [n for n in range(2, 3000) if all(n % d for d in range(2, int(n**0.5) + 1))]
+        self.assertEqual(trial, [n for n in range(3000) if rsa.is_prime(n)])
+        # Carmichael numbers and a strong pseudoprime to bases 2, 3, 5, 7
+        for n in (561, 41041, 825265, 321197185, 3215031751, 2**61 - 1, 2**89 - 1, 2**127 - 1):
+            with self.subTest(n=n):
+                self.assertEqual(n in (2**61 - 1, 2**89 - 1, 2**127 - 1), rsa.is_prime(n))
+        self.assertFalse(rsa.is_prime((2**61 - 1) * (2**89 - 1)))
+        self.assertFalse(rsa.is_prime(65537 * 65539))
+
+    def test_doctests(self):
+        self.assertEqual(0, doctest.testmod(rsa).failed)
+
+    def test_generate_prime(self):
+        state = random.getstate()
+        for bits in (2, 8, 31, 64, 65, 256):
+            with self.subTest(bits=bits):
+                prime = rsa.generate_prime(bits)
+                self.assertEqual(bits, prime.bit_length())
+                self.assertTrue(rsa.is_prime(prime))
+        self.assertEqual(state, random.getstate())
+
+    def test_generate_keypair_bits(self):
+        public, private = rsa.generate_keypair_bits(1024)
+        self.assertEqual(65537, public[0])
+        self.assertEqual(1024, public[1].bit_length())
+        self.assertEqual(public[1], private.n)
+        self.assertEqual(1, public[0] * private.d % ((private.p - 1) * (private.q - 1)))
+        self.assertEqual("Hello!", rsa.decrypt(private, rsa.encrypt(public, "Hello!")))
+        public, private = rsa.generate_keypair_bits(10)
+        self.assertEqual(10, public[1].bit_length())
+        self.assertNotEqual(private.p, private.q)
+        # at 10 bits both primes are 29 or 31, and 31 - 1 is divisible by 3
+        for bits, exponent in ((8, 65537), (9, 65537), (64, 4), (64, 1), (10, 3)):
+            with self.subTest(bits=bits, exponent=exponent):
+                with self.assertRaises(ValueError):
+                    rsa.generate_keypair_bits(bits, exponent)
+
     def test_gcd(self):
         self.assertEqual(0, rsa.gcd(0, 0))
         self.assertEqual(1, rsa.gcd(3, 7))
@@ -39,8 +82,182 @@ class RSATestCase(unittest.TestCase):
 
     def test_generate_keypair(self):
         random.seed(1234567)
-        self.assertEqual(((121, 323), (169, 323)), rsa.generate_keypair(17, 19))
-        self.assertEqual(((142169, 1697249), (734969, 1697249)), rsa.generate_keypair(1229, 1381))
+        self.assertEqual(((121, 323), (169, 323)), rsa.generate_keypair(17, 19, exponent=None))
+        self.assertEqual(((142169, 1697249), (734969, 1697249)), rsa.generate_keypair(1229, 1381, exponent=None))
         self.assertEqual(
-            ((9678731, 11188147), (1804547, 11188147)), rsa.generate_keypair(3259, 3433)
-        )
\ No newline at end of file
+            ((9678731, 11188147), (1804547, 11188147)), rsa.generate_keypair(3259, 3433, exponent=None)
+        )
+
+    def test_generate_keypair_exponent(self):
+        self.assertEqual(((65537, 1697249), (1395233, 1697249)), rsa.generate_keypair(1229, 1381))
+        # 65537 is not below phi = 288, and 3 divides it
+        self.assertEqual(((5, 323), (173, 323)), rsa.generate_keypair(17, 19))
+        self.assertEqual(((7, 11188147), (1597351, 11188147)), rsa.generate_keypair(3259, 3433, exponent=7))
+        # here 65537 divides phi, so the smallest odd prime coprime with phi is taken
+        p, q = 65537 * 14 + 1, 65537 * 20 + 1
+        self.assertTrue(rsa.is_prime(p) and rsa.is_prime(q))
+        (e, n), (d, _) = rsa.generate_keypair(p, q)
+        self.assertEqual(3, e)
+        self.assertEqual(1, e * d % ((p - 1) * (q - 1)))
+
+    def test_encrypt_decrypt(self):
+        public, private = ((121, 323), (169, 323))
+        plaintext = "Hello, RSA!"
+        ciphertext = rsa.encrypt(public, plaintext)
+        self.assertEqual([pow(ord(char), 121, 323) for char in plaintext], ciphertext)
+        self.assertEqual(plaintext, rsa.decrypt(private, ciphertext))
+        self.assertEqual(plaintext, rsa.decrypt(rsa.PrivateKey(17, 19, 169), ciphertext))
+
+    def test_private_key_crt(self):
+        p, q = 2**61 - 1, 2**89 - 1
+        d = rsa.multiplicative_inverse(65537, (p - 1) * (q - 1))
+        key = rsa.PrivateKey(p, q, d)
+        self.assertEqual((d, p * q), tuple(key))
+        for value in (0, 1, p, q, p * q - 1, random.randrange(p * q)):
+            self.assertEqual(pow(value, d, p * q), key.power(value))
+        plaintext = "Привет, мир! 🐍"
+        self.assertEqual(plaintext, rsa.decrypt(key, rsa.encrypt((65537, p * q), plaintext)))
+        with self.assertRaises(ValueError):
+            rsa.PrivateKey(17, 17, 1)
+
+    def test_blocks(self):
+        public, private = rsa.generate_keypair_bits(512)
+        payload, block = rsa.block_sizes(public[1])
+        self.assertEqual((62, 64), (payload, block))
+        for plaintext in ("", "\x00\x00abc", "Привет, мир! " * 20, "x" * payload, "x" * (payload + 1)):
+            with self.subTest(length=len(plaintext)):
+                ciphertext = rsa.encrypt_blocks(public, plaintext)
+                blocks = -(-len(plaintext.encode()) // payload)
+                self.assertEqual(blocks * block, len(ciphertext))
+                self.assertEqual(plaintext, rsa.decrypt_blocks(private, ciphertext))
+                self.assertEqual(plaintext, rsa.decrypt_blocks(tuple(private), ciphertext))
+        with self.assertRaises(ValueError):
+            rsa.decrypt_blocks(private, b"\x00" * (block + 1))
+        with self.assertRaises(ValueError):
+            rsa.encrypt_blocks((121, 323), "Hi")
+
+    def test_multiplicative_inverse_large(self):
+        p, q = 2**521 - 1, 2**607 - 1
+        self.assertEqual(1, rsa.multiplicative_inverse(q, p) * q % p)
+        g, x, y = rsa.extended_gcd(2**4423 - 1, 2**3217 - 1)
+        self.assertEqual((1, 1), (g, (2**4423 - 1) * x + (2**3217 - 1) * y))
+
+    def test_batch_inverse(self):
+        modulus = 2**127 - 1
+        values = [random.randrange(1, modulus) for _ in range(100)]
+        self.assertEqual([rsa.multiplicative_inverse(v, modulus) for v in values], rsa.batch_inverse(values, modulus))
+        values = [7, 0, 4, 9, 121]
+        self.assertEqual([rsa.multiplicative_inverse(v, 40) for v in values], rsa.batch_inverse(iter(values), 40))
+        self.assertEqual([], rsa.batch_inverse([], 40))
+        self.assertEqual([0, 0], rsa.batch_inverse([3, 5], 1))
+
+    def test_generate_keypairs(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                keypairs = list(rsa.generate_keypairs(4, 256, workers=workers))
+                self.assertEqual(4, len(keypairs))
+                self.assertEqual(4, len({public[1] for public, _ in keypairs}))
+                for public, private in keypairs:
+                    self.assertEqual("key", rsa.decrypt(private, rsa.encrypt(public, "key")))
+        self.assertEqual([], list(rsa.generate_keypairs(0, 256, workers=2)))
+
+    def test_stream(self):
+        public, private = rsa.generate_keypair_bits(512)
+        data = os.urandom(1000)
+        chunks = [data[start : start + size] for start, size in zip(range(0, 1000, 97), [97] * 20)]
+        blocks = list(rsa.encrypt_stream(public, chunks))
+        self.assertEqual([64] * 17, [len(block) for block in blocks])
+        ciphertext = b"".join(blocks)
+        self.assertEqual(data, b"".join(rsa.decrypt_stream(private, [ciphertext[:10], ciphertext[10:]])))
+        self.assertEqual([], list(rsa.encrypt_stream(public, [b"", b""])))
+        with self.assertRaises(ValueError):
+            list(rsa.decrypt_stream(private, [ciphertext[:-1]]))
+
+    def test_file_roundtrip(self):
+        public, private = rsa.generate_keypair_bits(512)
+        with tempfile.TemporaryDirectory() as tmp:
+            src, enc, dec = (os.path.join(tmp, name) for name in ("src", "enc", "dec"))
+            for data in (b"", os.urandom(5000)):
+                with self.subTest(size=len(data)):
+                    with open(src, "wb") as f:
+                        f.write(data)
+                    rsa.encrypt_file(public, src, enc, chunk_size=100)
+                    rsa.decrypt_file(private, enc, dec)
+                    with open(dec, "rb") as f:
+                        self.assertEqual(data, f.read())
+            with open(enc, "rb") as f:
+                framed = f.read()
+            with self.assertRaises(ValueError):
+                list(rsa.read_frames(io.BytesIO(framed[:-1])))
+            with self.assertRaises(ValueError):
+                list(rsa.read_frames(io.BytesIO(b"RSA" + framed)))
+
+    def test_save_load_key(self):
+        public, private = rsa.generate_keypair_bits(256)
+        with tempfile.TemporaryDirectory() as tmp:
+            rsa.save_key(public, os.path.join(tmp, "public"))
+            rsa.save_key(private, os.path.join(tmp, "private"))
+            self.assertEqual(public, rsa.load_key(os.path.join(tmp, "public")))
+            self.assertEqual(private, rsa.load_key(os.path.join(tmp, "private")))
+            if os.name == "posix":
+                self.assertEqual(0o600, os.stat(os.path.join(tmp, "private")).st_mode & 0o777)
+                os.chmod(os.path.join(tmp, "private"), 0o644)
+                rsa.save_key(private, os.path.join(tmp, "private"))
+                self.assertEqual(0o600, os.stat(os.path.join(tmp, "private")).st_mode & 0o777)
+
+    def test_key_objects(self):
+        public, private = rsa.generate_keypair_bits(512)
+        self.assertIsInstance(public, rsa.PublicKey)
+        self.assertEqual((65537, private.n), tuple(public))
+        self.assertEqual((512, (62, 64)), (public.bits, public.sizes))
+        self.assertIs(public, rsa.as_key(public))
+        self.assertEqual(rsa.CachedKey(65537, private.n), rsa.as_key(tuple(public)))
+        self.assertEqual("CachedKey(exponent=3, n=323)", repr(rsa.as_key((3, 323))))
+        self.assertNotEqual(public, rsa.as_key(tuple(public)))
+        messages = ["", "Hi", "Привет, мир! " * 10]
+        ciphertexts = rsa.encrypt_many(tuple(public), messages)
+        self.assertEqual([rsa.encrypt_blocks(public, message) for message in messages], ciphertexts)
+        self.assertEqual(messages, rsa.decrypt_many(private, ciphertexts))
+        self.assertEqual(messages, rsa.decrypt_many(tuple(private), iter(ciphertexts)))
+        with self.assertRaises(ValueError):
+            rsa.PublicKey(121, 323).sizes
+
+    def test_prime_sieve(self):
+        trial = [n for n in range(2, 5000) if all(n % d for d in range(2, int(n**0.5) + 1))]
+        sieve = rsa.PrimeSieve(10, max_limit=10000)
+        self.assertEqual(10, sieve.limit)
+        self.assertEqual(trial, [n for n in range(-5, 5000) if n in sieve])
+        self.assertEqual(trial, list(sieve.primes(0, 5000)))
+        self.assertEqual([9973], list(sieve.primes(9970, 20000)))
+        with self.assertRaises(ValueError):
+            10001 in sieve
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sieve")
+            sieve.save(path)
+            loaded = rsa.PrimeSieve.load(path, max_limit=1 << 16)
+            self.assertEqual(sieve.limit, loaded.limit)
+            self.assertEqual(trial, list(loaded.primes(0, 5000)))
+            self.assertIn(65521, loaded)
+            self.assertEqual(rsa.SMALL_PRIMES, list(loaded.primes(0, 1 << 16)))
+
+    def test_primes_in_range(self):
+        limit = rsa.SIEVE.max_limit
+        expected = [n for n in range(limit - 1000, limit + 1000) if rsa.is_prime(n)]
+        self.assertEqual(expected, list(rsa.primes_in_range(limit - 1000, limit + 1000)))
+        self.assertEqual([2, 3, 5, 7], list(rsa.primes_in_range(-10, 10)))
+        self.assertEqual([], list(rsa.primes_in_range(20, 10)))
+        big = 2**61 - 1
+        self.assertEqual([big], list(rsa.primes_in_range(big - 5, big + 1)))
+
+    def test_batch_gcd(self):
+        primes = [rsa.generate_prime(64) for _ in range(41)]
+        shared = primes.pop()
+        moduli = [primes[i] * primes[i + 1] for i in range(0, 40, 2)]
+        moduli[3] = shared * primes[7]
+        moduli[15] = shared * primes[31]
+        expected = [shared if i in (3, 15) else 1 for i in range(20)]
+        self.assertEqual(expected, rsa.batch_gcd(moduli))
+        self.assertEqual(expected, [rsa.gcd(n, math.prod(moduli) // n) for n in moduli])
+        self.assertEqual([moduli[0], moduli[0], 1], rsa.batch_gcd([moduli[0], moduli[0], moduli[1]]))
+        self.assertEqual([1], rsa.batch_gcd([moduli[0]]))
+        self.assertEqual([], rsa.batch_gcd([]))
@@ -1,8 +1,11 @@
+import os
 import random
 import string
+import tempfile
 import unittest
 
 import vigenere
+from alphabet import CYRILLIC
 
 
 class VigenereTestCase(unittest.TestCase):
@@ -39,4 +42,138 @@ class VigenereTestCase(unittest.TestCase):
         keyword = ''.join(random.choice(string.ascii_letters) for _ in range(kwlen))
         plaintext = ''.join(random.choice(string.ascii_letters + ' -,') for _ in range(64))
         ciphertext = vigenere.encrypt_vigenere(plaintext, keyword)
-        self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, keyword))
\ No newline at end of file
+        self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, keyword))
+
+    def test_stream_carries_key_position(self):
+        keyword = "LEMON"
+        plaintext = "".join(random.choice(string.ascii_letters + " -,") for _ in range(1000))
+        for size in (1, 3, 5, 7, 64):
+            chunks = [plaintext[i : i + size] for i in range(0, len(plaintext), size)]
+            with self.subTest(size=size):
+                ciphertext = "".join(vigenere.encrypt_vigenere_stream(chunks, keyword))
+                self.assertEqual(vigenere.encrypt_vigenere(plaintext, keyword), ciphertext)
+                self.assertEqual(plaintext, "".join(vigenere.decrypt_vigenere_stream([ciphertext], keyword)))
+
+    def test_file_roundtrip(self):
+        plaintext = "Attack at dawn!\r\nЁж\n" * 100
+        with tempfile.TemporaryDirectory() as tmp:
+            src, enc, dec = (os.path.join(tmp, name) for name in ("src", "enc", "dec"))
+            with open(src, "w", encoding="utf-8", newline="") as f:
+                f.write(plaintext)
+            vigenere.encrypt_file(src, enc, "lemon", chunk_size=13)
+            vigenere.decrypt_file(enc, dec, "lemon", chunk_size=64)
+            with open(enc, encoding="utf-8", newline="") as f:
+                self.assertEqual(vigenere.encrypt_vigenere(plaintext, "lemon"), f.read())
+            with open(dec, encoding="utf-8", newline="") as f:
+                self.assertEqual(plaintext, f.read())
+
+    @unittest.skipIf(vigenere.np is None, "numpy is not installed")
+    def test_file_mmap(self):
+        plaintext = "Attack at dawn!\r\n" * 100 + "Ёж, Hello!\n" * 100
+        with tempfile.TemporaryDirectory() as tmp:
+            src, enc = os.path.join(tmp, "src"), os.path.join(tmp, "enc")
+            with open(src, "w", encoding="utf-8", newline="") as f:
+                f.write(plaintext)
+            for window in (7, 1 << 20):
+                with self.subTest(window=window):
+                    vigenere.encrypt_file_mmap(src, "lemon", enc, window=window)
+                    with open(enc, encoding="utf-8", newline="") as f:
+                        self.assertEqual(vigenere.encrypt_vigenere(plaintext, "lemon"), f.read())
+                    vigenere.decrypt_file_mmap(enc, "lemon", window=window)
+                    with open(enc, encoding="utf-8", newline="") as f:
+                        self.assertEqual(plaintext, f.read())
+
+    @unittest.skipIf(vigenere.np is None, "numpy is not installed")
+    def test_vectorized_matches_scalar(self):
+        alphabet = string.printable
+        data = "".join(random.choice(alphabet) for _ in range(5000))
+        for keyword in ("LEMON", "lsci", "MiXeD", "z"):
+            for key_index in (0, 3):
+                with self.subTest(keyword=keyword, key_index=key_index):
+                    key = vigenere.compile_key(keyword)
+                    for direction in (1, -1):
+                        expected = vigenere._shift_chars(data, key, direction, key_index)
+                        actual = vigenere._shift_bytes(data.encode(), key, direction, key_index)
+                        self.assertEqual(expected.encode(), actual)
+
+    def test_bytes_roundtrip(self):
+        data = bytes(range(256)) * 8
+        ciphertext = vigenere.encrypt_vigenere_bytes(data, "LEMON")
+        self.assertEqual(data, vigenere.decrypt_vigenere_bytes(ciphertext, "LEMON"))
+        letters = set(string.ascii_letters.encode())
+        for plain, cipher in zip(data, ciphertext):
+            if plain not in letters:
+                self.assertEqual(plain, cipher)
+
+    def test_parallel_matches_sequential(self):
+        keyword = "LEMON"
+        plaintext = "".join(random.choice(string.ascii_letters + " -,Ё") for _ in range(3000))
+        ciphertext = vigenere.encrypt_vigenere_parallel(plaintext, keyword, workers=3, chunk_size=333)
+        self.assertEqual(vigenere.encrypt_vigenere(plaintext, keyword), ciphertext)
+        self.assertEqual(
+            plaintext, vigenere.decrypt_vigenere_parallel(ciphertext, keyword, workers=2, chunk_size=1000)
+        )
+
+    def test_batch(self):
+        messages = [
+            "".join(random.choice(string.ascii_letters + " -,") for _ in range(random.randint(0, 20)))
+            for _ in range(200)
+        ]
+        keywords = [
+            "".join(random.choice(string.ascii_letters) for _ in range(random.randint(1, 8))) for _ in messages
+        ]
+        expected = [vigenere.encrypt_vigenere(m, "LEMON") for m in messages]
+        self.assertEqual(expected, vigenere.encrypt_vigenere_batch(messages, "LEMON"))
+        self.assertEqual(messages, vigenere.decrypt_vigenere_batch(expected, "LEMON"))
+        expected = [vigenere.encrypt_vigenere(m, k) for m, k in zip(messages, keywords)]
+        self.assertEqual(expected, vigenere.encrypt_vigenere_batch(messages, keywords))
+        self.assertEqual(messages, vigenere.decrypt_vigenere_batch(expected, iter(keywords)))
+        self.assertEqual(
+            [vigenere.encrypt_vigenere("Ёж hey", "lemon")], vigenere.encrypt_vigenere_batch(["Ёж hey"], "lemon")
+        )
+        with self.assertRaises(ValueError):
+            vigenere.encrypt_vigenere_batch(messages, ["a", "b"])
+        self.assertEqual([], vigenere.encrypt_vigenere_batch([], []))
+        self.assertEqual([], vigenere.decrypt_vigenere_batch([], "LEMON"))
+
+    def test_keyword_is_case_insensitive(self):
+        self.assertEqual("LXFOPVEFRNHR", vigenere.encrypt_vigenere("ATTACKATDAWN", "lEmOn"))
+        self.assertEqual("lxfopvefrnhr", vigenere.encrypt_vigenere("attackatdawn", "LeMoN"))
+
+    def test_compiled_key(self):
+        key = vigenere.compile_key("lEmOn")
+        self.assertIs(key, vigenere.compile_key("lEmOn"))
+        self.assertEqual((11, 4, 12, 14, 13), key.shifts)
+        plaintext = "Attack at dawn! " * 200
+        ciphertext = vigenere.encrypt_vigenere(plaintext, "LEMON")
+        self.assertEqual(ciphertext, vigenere.encrypt_vigenere(plaintext, key))
+        self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, key))
+        self.assertEqual(ciphertext[:16], vigenere.encrypt_vigenere(plaintext[:16], key))
+        self.assertEqual([ciphertext, ciphertext], vigenere.encrypt_vigenere_batch([plaintext] * 2, [key, "lemon"]))
+        self.assertEqual(ciphertext, "".join(vigenere.encrypt_vigenere_stream([plaintext[:5], plaintext[5:]], key)))
+        cyrillic = vigenere.VigenereKey("ключ", CYRILLIC)
+        self.assertEqual("Ъьжщпю, чфо!", vigenere.encrypt_vigenere("Привет, мир!", cyrillic))
+        with self.assertRaises(ValueError):
+            vigenere.encrypt_vigenere_bytes(b"data", cyrillic)
+
+    def test_long_keyword(self):
+        keyword = "".join(random.choice(string.ascii_letters) for _ in range(2000))
+        plaintext = "".join(random.choice(string.printable) for _ in range(5000))
+        ciphertext = vigenere.encrypt_vigenere(plaintext, keyword)
+        self.assertEqual(ciphertext[:100], vigenere.encrypt_vigenere(plaintext[:100], keyword))
+        self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, vigenere.compile_key(keyword)))
+
+    def test_invalid_keyword(self):
+        for keyword in ("", "key1", "ключ"):
+            with self.subTest(keyword=keyword):
+                with self.assertRaises(ValueError):
+                    vigenere.encrypt_vigenere("python", keyword)
+
+    def test_cyrillic(self):
+        plaintext = "Съешь же ещё этих мягких французских булок, да выпей чаю. Hello!"
+        ciphertext = vigenere.encrypt_vigenere(plaintext, "Ключ", CYRILLIC)
+        self.assertTrue(ciphertext.endswith("Hello!"))
+        self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, "ключ", CYRILLIC))
+        chunks = [plaintext[:7], plaintext[7:]]
+        self.assertEqual(ciphertext, "".join(vigenere.encrypt_vigenere_stream(chunks, "КЛЮЧ", CYRILLIC)))
+        self.assertEqual([ciphertext], vigenere.encrypt_vigenere_batch([plaintext], "ключ", CYRILLIC))
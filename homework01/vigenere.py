@@ -1,4 +1,138 @@
-def encrypt_vigenere(plaintext: str, keyword: str) -> str:
+import argparse
+import functools
+import itertools
+import os
+import pathlib
+import typing as tp
+from concurrent.futures import ProcessPoolExecutor
+
+from alphabet import ALPHABETS, LATIN, Alphabet
+from filemap import CHUNK_SIZE, WINDOW_SIZE, transform_mapped, transform_text_file
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+# Smaller chunks do not pay for sending the data to another process
+MIN_PARALLEL_CHUNK = 1 << 16
+# On short strings the numpy overhead outweighs the gain
+NUMPY_THRESHOLD = 1 << 10
+# How many compiled keys compile_key keeps
+KEY_CACHE_SIZE = 256
+
+
+class VigenereKey:
+    """
+    Vigenere keyword converted to alphabet shifts once.
+    The str.translate tables for both directions are built up front and the numpy
+    shift arrays lazily, so encryption never parses the keyword again.
+    >>> VigenereKey("Lemon").shifts
+    (11, 4, 12, 14, 13)
+    """
+
+    __slots__ = ("keyword", "alphabet", "shifts", "_tables", "_arrays")
+
+    def __init__(self, keyword: str, alphabet: Alphabet = LATIN) -> None:
+        if not keyword:
+            raise ValueError("Keyword must not be empty")
+        self.keyword = keyword
+        self.alphabet = alphabet
+        self.shifts = tuple(alphabet.shifts(keyword))
+        self._tables = {
+            direction: tuple(alphabet.translation_table(direction * shift) for shift in self.shifts)
+            for direction in (1, -1)
+        }
+        self._arrays: tp.Dict[int, "np.ndarray"] = {}
+
+    def __len__(self) -> int:
+        return len(self.shifts)
+
+    def __repr__(self) -> str:
+        return f"VigenereKey({self.keyword!r}, {self.alphabet!r})"
+
+    def tables(self, direction: int) -> tp.Tuple[tp.Dict[int, int], ...]:
+        """str.translate tables, one per key position."""
+        return self._tables[direction]
+
+    def array(self, direction: int) -> "np.ndarray":
+        """Shifts 0..size-1 for each key position as a uint8 array."""
+        if direction not in self._arrays:
+            shifts = np.array([direction * shift % self.alphabet.size for shift in self.shifts], dtype=np.uint8)
+            shifts.flags.writeable = False
+            self._arrays[direction] = shifts
+        return self._arrays[direction]
+
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+def compile_key(keyword: str, alphabet: Alphabet = LATIN) -> VigenereKey:
+    """
+    Returns a VigenereKey; repeated calls with the same keyword take it from the cache.
+    >>> compile_key("LEMON") is compile_key("LEMON")
+    True
+    """
+    return VigenereKey(keyword, alphabet)
+
+
+Keyword = tp.Union[str, VigenereKey]
+
+
+def _compile(keyword: Keyword, alphabet: Alphabet) -> VigenereKey:
+    """A compiled key keeps its own alphabet; a string keyword uses alphabet."""
+    if isinstance(keyword, VigenereKey):
+        return keyword
+    return compile_key(keyword, alphabet)
+
+
+def _shift_chars(text: str, key: VigenereKey, direction: int, key_index: int = 0) -> str:
+    """
+    Shifts the letters of text by key, starting at key position key_index.
+    direction is 1 to encrypt and -1 to decrypt.
+    Characters with the same key position form the slice text[pos::len(key)], so each
+    slice goes through a single str.translate and the slices are interleaved back.
+    """
+    tables = key.tables(direction)
+    key_len = len(tables)
+    key_index %= key_len
+    rotated = (tables[key_index:] + tables[:key_index])[: len(text)]
+    if len(rotated) == 1:
+        return text.translate(rotated[0])
+    parts = [text[pos::key_len].translate(table) for pos, table in enumerate(rotated)]
+    return "".join(itertools.chain.from_iterable(itertools.zip_longest(*parts, fillvalue="")))
+
+
+def _shift_codes(codes: "np.ndarray", shifts: "np.ndarray") -> "np.ndarray":
+    """Shifts the Latin letters in an array of ASCII codes by shifts (0..25 per position)."""
+    result = codes.copy()
+    for start in (ord("A"), ord("a")):
+        # all arithmetic fits in uint8; branches are replaced with arithmetic
+        # because np.where on a random mask is noticeably slower
+        offset = codes - np.uint8(start)
+        delta = offset + shifts
+        np.minimum(delta, delta - np.uint8(26), out=delta)
+        delta -= offset
+        delta *= offset < 26
+        result += delta
+    return result
+
+
+def _shift_bytes(data: tp.Union[bytes, memoryview], key: VigenereKey, direction: int, key_index: int = 0) -> bytes:
+    """Vectorized _shift_chars for Latin letters in ASCII data, where every byte is one character."""
+    if np is None:
+        return _shift_chars(bytes(data).decode("latin-1"), key, direction, key_index).encode("latin-1")
+    codes = np.frombuffer(data, dtype=np.uint8)
+    rotated = np.roll(key.array(direction), -(key_index % len(key)))
+    return _shift_codes(codes, np.tile(rotated, len(codes) // len(key) + 1)[: len(codes)]).tobytes()
+
+
+def _shift_text(text: str, key: VigenereKey, direction: int, key_index: int = 0) -> str:
+    """Uses the vectorized implementation for long ASCII strings and the per-character one otherwise."""
+    if np is not None and key.alphabet == LATIN and len(text) >= NUMPY_THRESHOLD and text.isascii():
+        return _shift_bytes(text.encode("ascii"), key, direction, key_index).decode("ascii")
+    return _shift_chars(text, key, direction, key_index)
+
+
+def encrypt_vigenere(plaintext: str, keyword: Keyword, alphabet: Alphabet = LATIN) -> str:
     """
     Encrypts plaintext using a Vigenere cipher.
     >>> encrypt_vigenere("PYTHON", "A")
@@ -7,27 +141,15 @@ def encrypt_vigenere(plaintext: str, keyword: str) -> str:
     'python'
     >>> encrypt_vigenere("ATTACKATDAWN", "LEMON")
     'LXFOPVEFRNHR'
+    >>> encrypt_vigenere("Привет, мир!", "ключ", ALPHABETS["cyrillic"])
+    'Ъьжщпю, чфо!'
+    >>> encrypt_vigenere("ATTACKATDAWN", compile_key("LEMON"))
+    'LXFOPVEFRNHR'
     """
-    ciphertext = ""
-    key_len = len(keyword)
-    key_index = 0
-    for symbol in plaintext:
-        shift = ord(keyword[key_index % key_len])
-        if "A" <= symbol <= "Z":
-            start = ord("A")
-            move = shift - ord("A")
-            ciphertext += chr(start + (ord(symbol) - start + move) % 26)
-        elif "a" <= symbol <= "z":
-            start = ord("a")
-            move = shift - ord("a")
-            ciphertext += chr(start + (ord(symbol) - start + move) % 26)
-        else:
-            ciphertext += symbol
-        key_index += 1
-    return ciphertext
+    return _shift_text(plaintext, _compile(keyword, alphabet), 1)
 
 
-def decrypt_vigenere(ciphertext: str, keyword: str) -> str:
+def decrypt_vigenere(ciphertext: str, keyword: Keyword, alphabet: Alphabet = LATIN) -> str:
     """
     Decrypts a ciphertext using a Vigenere cipher.
     >>> decrypt_vigenere("PYTHON", "A")
@@ -37,20 +159,273 @@ def decrypt_vigenere(ciphertext: str, keyword: str) -> str:
     >>> decrypt_vigenere("LXFOPVEFRNHR", "LEMON")
     'ATTACKATDAWN'
     """
-    plaintext = ""
-    key_len = len(keyword)
+    return _shift_text(ciphertext, _compile(keyword, alphabet), -1)
+
+
+def _latin_key(keyword: Keyword) -> VigenereKey:
+    key = _compile(keyword, LATIN)
+    if key.alphabet != LATIN:
+        raise ValueError("Byte-level modes support only the Latin alphabet")
+    return key
+
+
+def encrypt_vigenere_bytes(data: bytes, keyword: Keyword) -> bytes:
+    """
+    Encrypts ASCII letters of a byte string, leaving other bytes untouched.
+    >>> encrypt_vigenere_bytes(b"ATTACKATDAWN", "LEMON")
+    b'LXFOPVEFRNHR'
+    """
+    return _shift_bytes(data, _latin_key(keyword), 1)
+
+
+def decrypt_vigenere_bytes(data: bytes, keyword: Keyword) -> bytes:
+    """
+    Decrypts ASCII letters of a byte string, leaving other bytes untouched.
+    >>> decrypt_vigenere_bytes(b"LXFOPVEFRNHR", "LEMON")
+    b'ATTACKATDAWN'
+    """
+    return _shift_bytes(data, _latin_key(keyword), -1)
+
+
+def _shift_batch(messages: tp.List[str], keys: tp.List[VigenereKey], direction: int) -> tp.List[str]:
+    """
+    Processes all messages in one vectorized pass: the messages are joined and
+    the key position of each character is counted from the start of its message.
+    keys holds either one key for all messages or one key per message.
+    """
+    if not messages:
+        return []
+    joined = "".join(messages)
+    if np is None or any(key.alphabet != LATIN for key in keys) or not joined.isascii():
+        if len(keys) == 1:
+            return [_shift_chars(message, keys[0], direction) for message in messages]
+        return [_shift_chars(message, key, direction) for message, key in zip(messages, keys)]
+    codes = np.frombuffer(joined.encode("ascii"), dtype=np.uint8)
+    lengths = np.fromiter(map(len, messages), dtype=np.intp, count=len(messages))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    positions = np.arange(len(codes)) - np.repeat(starts, lengths)
+    if len(keys) == 1:
+        shifts = keys[0].array(direction)[positions % len(keys[0])]
+    else:
+        key_lens = np.fromiter(map(len, keys), dtype=np.intp, count=len(keys))
+        key_starts = np.cumsum(key_lens) - key_lens
+        all_shifts = np.concatenate([key.array(direction) for key in keys])
+        shifts = all_shifts[np.repeat(key_starts, lengths) + positions % np.repeat(key_lens, lengths)]
+    result = _shift_codes(codes, shifts).tobytes().decode("ascii")
+    return [result[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+
+
+def _batch(
+    messages: tp.Iterable[str], keyword: tp.Union[Keyword, tp.Iterable[Keyword]], direction: int, alphabet: Alphabet
+) -> tp.List[str]:
+    messages = list(messages)
+    if isinstance(keyword, (str, VigenereKey)):
+        return _shift_batch(messages, [_compile(keyword, alphabet)], direction)
+    keys = [_compile(key, alphabet) for key in keyword]
+    if len(keys) != len(messages):
+        raise ValueError("Number of keywords must match number of messages")
+    return _shift_batch(messages, keys, direction)
+
+
+def encrypt_vigenere_batch(
+    messages: tp.Iterable[str], keyword: tp.Union[Keyword, tp.Iterable[Keyword]], alphabet: Alphabet = LATIN
+) -> tp.List[str]:
+    """
+    Encrypts many messages at once, with one keyword or a keyword per message.
+    >>> encrypt_vigenere_batch(["ATTACK", "ATDAWN"], "LEMON")
+    ['LXFOPV', 'LXPOJY']
+    >>> encrypt_vigenere_batch(["python", "PYTHON"], ["a", "B"])
+    ['python', 'QZUIPO']
+    """
+    return _batch(messages, keyword, 1, alphabet)
+
+
+def decrypt_vigenere_batch(
+    messages: tp.Iterable[str], keyword: tp.Union[Keyword, tp.Iterable[Keyword]], alphabet: Alphabet = LATIN
+) -> tp.List[str]:
+    """
+    Decrypts many messages at once, with one keyword or a keyword per message.
+    >>> decrypt_vigenere_batch(["LXFOPV", "LXPOJY"], "LEMON")
+    ['ATTACK', 'ATDAWN']
+    """
+    return _batch(messages, keyword, -1, alphabet)
+
+
+def _shift_parallel(
+    text: str,
+    keyword: Keyword,
+    direction: int,
+    workers: tp.Optional[int],
+    chunk_size: tp.Optional[int],
+    alphabet: Alphabet,
+) -> str:
+    """Splits text into chunks, processes them in a process pool and joins the results in order."""
+    key = _compile(keyword, alphabet)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(len(text) // (workers * 4) + 1, MIN_PARALLEL_CHUNK)
+    if workers == 1 or len(text) <= chunk_size:
+        return _shift_text(text, key, direction)
+    starts = range(0, len(text), chunk_size)
+    chunks = (text[start : start + chunk_size] for start in starts)
+    # the key position at the start of a chunk follows from the chunk offset
+    key_indices = (start % len(key) for start in starts)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = executor.map(
+            _shift_text,
+            chunks,
+            itertools.repeat(key),
+            itertools.repeat(direction),
+            key_indices,
+        )
+        return "".join(parts)
+
+
+def encrypt_vigenere_parallel(
+    plaintext: str,
+    keyword: Keyword,
+    workers: tp.Optional[int] = None,
+    chunk_size: tp.Optional[int] = None,
+    alphabet: Alphabet = LATIN,
+) -> str:
+    """
+    Encrypts plaintext using a pool of workers processes (all cores by default).
+    >>> encrypt_vigenere_parallel("ATTACKATDAWN", "LEMON", workers=2, chunk_size=5)
+    'LXFOPVEFRNHR'
+    """
+    return _shift_parallel(plaintext, keyword, 1, workers, chunk_size, alphabet)
+
+
+def decrypt_vigenere_parallel(
+    ciphertext: str,
+    keyword: Keyword,
+    workers: tp.Optional[int] = None,
+    chunk_size: tp.Optional[int] = None,
+    alphabet: Alphabet = LATIN,
+) -> str:
+    """
+    Decrypts ciphertext using a pool of workers processes (all cores by default).
+    >>> decrypt_vigenere_parallel("LXFOPVEFRNHR", "LEMON", workers=2, chunk_size=5)
+    'ATTACKATDAWN'
+    """
+    return _shift_parallel(ciphertext, keyword, -1, workers, chunk_size, alphabet)
+
+
+def _shift_stream(chunks: tp.Iterable[str], keyword: Keyword, direction: int, alphabet: Alphabet) -> tp.Iterator[str]:
+    key = _compile(keyword, alphabet)
     key_index = 0
-    for symbol in ciphertext:
-        shift = ord(keyword[key_index % key_len])
-        if "A" <= symbol <= "Z":
-            start = ord("A")
-            move = shift - ord("A")
-            plaintext += chr(start + (ord(symbol) - start - move) % 26)
-        elif "a" <= symbol <= "z":
-            start = ord("a")
-            move = shift - ord("a")
-            plaintext += chr(start + (ord(symbol) - start - move) % 26)
+    for chunk in chunks:
+        yield _shift_text(chunk, key, direction, key_index)
+        # the key position carries over chunk boundaries
+        key_index = (key_index + len(chunk)) % len(key)
+
+
+def encrypt_vigenere_stream(chunks: tp.Iterable[str], keyword: Keyword, alphabet: Alphabet = LATIN) -> tp.Iterator[str]:
+    """
+    Encrypts a stream of text chunks; the result matches encrypt_vigenere on the joined text.
+    >>> "".join(encrypt_vigenere_stream(["ATTAC", "KATDAWN"], "LEMON"))
+    'LXFOPVEFRNHR'
+    """
+    return _shift_stream(chunks, keyword, 1, alphabet)
+
+
+def decrypt_vigenere_stream(chunks: tp.Iterable[str], keyword: Keyword, alphabet: Alphabet = LATIN) -> tp.Iterator[str]:
+    """
+    Decrypts a stream of text chunks; the result matches decrypt_vigenere on the joined text.
+    >>> "".join(decrypt_vigenere_stream(["LXF", "OPVEFRNHR"], "LEMON"))
+    'ATTACKATDAWN'
+    """
+    return _shift_stream(chunks, keyword, -1, alphabet)
+
+
+def encrypt_file(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Union[str, pathlib.Path],
+    keyword: Keyword,
+    chunk_size: int = CHUNK_SIZE,
+    alphabet: Alphabet = LATIN,
+) -> None:
+    """
+    Encrypts the UTF-8 file src into dst ("-" is stdin/stdout) chunk_size characters at a time;
+    the key position carries over from one chunk to the next.
+    """
+    transform_text_file(src, dst, lambda chunks: _shift_stream(chunks, keyword, 1, alphabet), chunk_size)
+
+
+def decrypt_file(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Union[str, pathlib.Path],
+    keyword: Keyword,
+    chunk_size: int = CHUNK_SIZE,
+    alphabet: Alphabet = LATIN,
+) -> None:
+    """Decrypts a file written by encrypt_file with the same keyword and alphabet."""
+    transform_text_file(src, dst, lambda chunks: _shift_stream(chunks, keyword, -1, alphabet), chunk_size)
+
+
+def _mmap_file(
+    src: tp.Union[str, pathlib.Path],
+    dst: tp.Optional[tp.Union[str, pathlib.Path]],
+    keyword: Keyword,
+    direction: int,
+    window: int,
+) -> None:
+    if np is None:
+        raise RuntimeError("Memory-mapped mode requires numpy")
+    key = _latin_key(keyword)
+    table = key.array(direction)
+    chars_seen = 0
+
+    def transform(window_in: memoryview, window_out: memoryview) -> None:
+        nonlocal chars_seen
+        codes = np.frombuffer(window_in, dtype=np.uint8)
+        if codes.max() < 0x80:
+            result = np.frombuffer(_shift_bytes(window_in, key, direction, chars_seen), dtype=np.uint8)
+            chars_seen += len(codes)
         else:
-            plaintext += symbol
-        key_index += 1
-    return plaintext
+            # the key advances per character, not per byte: a UTF-8 character starts with a byte outside 0x80..0xBF
+            leads = np.cumsum((codes & 0xC0) != 0x80, dtype=np.int32)
+            key_positions = (leads + np.int32(chars_seen % len(key) - 1)) % len(key)
+            result = _shift_codes(codes, table[key_positions])
+            chars_seen += int(leads[-1])
+        np.frombuffer(window_out, dtype=np.uint8)[:] = result
+
+    transform_mapped(src, dst, transform, window)
+
+
+def encrypt_file_mmap(
+    src: tp.Union[str, pathlib.Path],
+    keyword: Keyword,
+    dst: tp.Optional[tp.Union[str, pathlib.Path]] = None,
+    window: int = WINDOW_SIZE,
+) -> None:
+    """
+    Encrypts the Latin letters of a UTF-8 file through mmap, window bytes at a time.
+    Without dst the file is changed in place. The result matches encrypt_file.
+    """
+    _mmap_file(src, dst, keyword, 1, window)
+
+
+def decrypt_file_mmap(
+    src: tp.Union[str, pathlib.Path],
+    keyword: Keyword,
+    dst: tp.Optional[tp.Union[str, pathlib.Path]] = None,
+    window: int = WINDOW_SIZE,
+) -> None:
+    """Decrypts a file written by encrypt_file_mmap; without dst the file is changed in place."""
+    _mmap_file(src, dst, keyword, -1, window)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vigenere cipher, file to file or stdin to stdout")
+    parser.add_argument("mode", choices=["encrypt", "decrypt"])
+    parser.add_argument("keyword")
+    parser.add_argument("src", nargs="?", default="-")
+    parser.add_argument("dst", nargs="?", default="-")
+    parser.add_argument("--alphabet", choices=sorted(ALPHABETS), default="latin")
+    args = parser.parse_args()
+    if args.mode == "encrypt":
+        encrypt_file(args.src, args.dst, args.keyword, alphabet=ALPHABETS[args.alphabet])
+    else:
+        decrypt_file(args.src, args.dst, args.keyword, alphabet=ALPHABETS[args.alphabet])
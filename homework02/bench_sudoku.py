@@ -0,0 +1,168 @@
+"""Бенчмарки решателя Судоку: python bench_sudoku.py <benchmark> [--puzzles hard_puzzles.txt] [--reference 1]"""
+
+import argparse
+import os
+import pathlib
+import statistics
+import tempfile
+import time
+import tracemalloc
+import typing as tp
+
+import sudoku
+
+Grid = tp.List[tp.List[str]]
+
+# Пазлы, неудобные для перебора по клеткам. Последний не имеет решения: движки, перебирающие
+# клетки, тратят на него больше пяти минут, поэтому в бенчмарке он решается только через DLX
+ADVERSARIAL = {
+    "anti-brute": "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+    "inkala": "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "17-clue": ".......1.4.........2...........5.4.7..8...3....1.9....3..4..2...5.1........8.6...",
+    "impossible": ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4.........",
+}
+
+
+def measure(func: tp.Callable[[], tp.Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def read_puzzles(path: tp.Union[str, pathlib.Path]) -> tp.List[Grid]:
+    """Пазлы в однострочном формате, по одному на строку"""
+    with open(path) as f:
+        return [sudoku.create_grid(line) for line in f if line.strip()]
+
+
+def solve_checked(grid: Grid, engine: str) -> None:
+    solution = sudoku.solve(grid, engine)
+    assert solution is not None and sudoku.check_solution(solution), engine
+
+
+def bench_engines(puzzles: tp.List[Grid], reference: int) -> None:
+    """
+    Время на каждом пазле: bitmask на всех, эталонный перебор только на первых reference,
+    потому что на трудных пазлах он тратит минуты
+    """
+    print(f"{'puzzle':>6} {'backtracking, s':>16} {'bitmask, s':>11} {'speedup':>8}")
+    total = 0.0
+    for i, grid in enumerate(puzzles):
+        fast = measure(lambda: solve_checked(grid, "bitmask"))
+        total += fast
+        if i < reference:
+            slow = measure(lambda: solve_checked(grid, "backtracking"))
+            print(f"{i:>6} {slow:>16.3f} {fast:>11.4f} {slow / fast:>8.0f}")
+        else:
+            print(f"{i:>6} {'-':>16} {fast:>11.4f} {'-':>8}")
+    print(f"bitmask: {len(puzzles)} puzzles in {total:.3f} s, {total / len(puzzles) * 1e3:.2f} ms per puzzle")
+
+
+def bench_strategies(puzzles: tp.List[Grid], reference: int) -> None:
+    """Время на пазл (среднее и 99-й перцентиль) и счётчики SolveStats для движков, кроме эталонного"""
+    print(f"{'engine':>10} {'mean, ms':>9} {'p99, ms':>9} {'max, ms':>9} {'nodes':>9} {'propagations':>13}")
+    for engine in sudoku.ENGINES:
+        if engine == "backtracking":
+            continue
+        stats = sudoku.SolveStats()
+        times = [measure(lambda: sudoku.solve(grid, engine, stats)) for grid in puzzles]
+        p99 = statistics.quantiles(times, n=100, method="inclusive")[98] if len(times) > 1 else times[0]
+        print(
+            f"{engine:>10} {statistics.fmean(times) * 1e3:>9.2f} {p99 * 1e3:>9.2f} {max(times) * 1e3:>9.2f}"
+            f" {stats.nodes / len(puzzles):>9.0f} {stats.propagations / len(puzzles):>13.0f}"
+        )
+
+
+def bench_files(puzzles: tp.List[Grid], reference: int) -> None:
+    """puzzle1-3.txt всеми движками, секунды"""
+    print(f"{'file':>12} " + " ".join(f"{engine:>12}" for engine in sudoku.ENGINES))
+    for name in ("puzzle1.txt", "puzzle2.txt", "puzzle3.txt"):
+        grid = sudoku.read_sudoku(name)
+        times = [measure(lambda: solve_checked(grid, engine)) for engine in sudoku.ENGINES]
+        print(f"{name:>12} " + " ".join(f"{elapsed:>12.4f}" for elapsed in times))
+
+
+def bench_adversarial(puzzles: tp.List[Grid], reference: int) -> None:
+    """ADVERSARIAL всеми движками, кроме эталонного, секунды; count - время count_solutions"""
+    engines = [engine for engine in sudoku.ENGINES if engine != "backtracking"]
+    print(f"{'puzzle':>12} " + " ".join(f"{engine:>10}" for engine in engines) + f" {'count':>10} {'solutions':>10}")
+    for name, line in ADVERSARIAL.items():
+        grid = sudoku.create_grid(line)
+        if name == "impossible":
+            times = [
+                f"{measure(lambda: sudoku.solve(grid, engine)):.4f}" if engine == "dlx" else "-" for engine in engines
+            ]
+        else:
+            times = [f"{measure(lambda: solve_checked(grid, engine)):.4f}" for engine in engines]
+        solutions: tp.List[int] = []
+        count = measure(lambda: solutions.append(sudoku.count_solutions(grid)))
+        print(f"{name:>12} " + " ".join(f"{elapsed:>10}" for elapsed in times) + f" {count:>10.4f} {solutions[0]:>10}")
+
+
+def bench_batch(puzzles: tp.List[Grid], max_workers: int, repeat: int = 4) -> None:
+    """solve_file на файле из repeat копий пазлов: пазлов в секунду от 1 до max_workers процессов"""
+    print(f"{'puzzles':>8} {'workers':>8} {'puzzles/s':>10} {'speedup':>8} {'mean, ms':>9} {'max, ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "puzzles"), os.path.join(tmp, "solutions")
+        with open(src, "w") as f:
+            f.writelines(sudoku.grid_to_line(grid) + "\n" for grid in puzzles * repeat)
+        base = 0.0
+        for workers in range(1, max_workers + 1):
+            report = sudoku.solve_file(src, dst, workers=workers, chunk_size=16)
+            with open(dst) as f:
+                times = [float(line.split("\t")[1]) for line in f]
+            base = base or report.rate
+            print(
+                f"{report.puzzles:>8} {workers:>8} {report.rate:>10.1f} {report.rate / base:>8.2f}"
+                f" {statistics.fmean(times):>9.2f} {max(times):>9.2f}"
+            )
+
+
+def measure_memory(build: tp.Callable[[], tp.Any]) -> tp.Tuple[int, float]:
+    """Байты, которые занимает результат build() по tracemalloc, и время построения"""
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size, elapsed
+
+
+def bench_memory(puzzles: tp.List[Grid], count: int = 100000) -> None:
+    """Память на count пазлов: списки списков, строки, Grid, GridBatch и буфер из Grid.pack()"""
+    lines = [sudoku.grid_to_line(puzzles[i % len(puzzles)]) for i in range(count)]
+    representations: tp.Dict[str, tp.Callable[[], tp.Any]] = {
+        "list": lambda: [sudoku.create_grid(line) for line in lines],
+        "line": lambda: [line.encode().decode() for line in lines],
+        "Grid": lambda: [sudoku.Grid.from_line(line) for line in lines],
+        "GridBatch": lambda: sudoku.GridBatch.from_lines(lines),
+        "packed": lambda: bytearray(b"".join(sudoku.Grid.from_line(line).pack() for line in lines)),
+    }
+    print(f"{'format':>9} {'puzzles':>8} {'MB':>8} {'bytes/puzzle':>13} {'vs list':>8} {'build, s':>9}")
+    base = 0.0
+    for name, build in representations.items():
+        size, elapsed = measure_memory(build)
+        base = base or size
+        print(f"{name:>9} {count:>8} {size / 2**20:>8.1f} {size / count:>13.0f} {base / size:>8.1f} {elapsed:>9.2f}")
+
+
+BENCHMARKS: tp.Dict[str, tp.Callable[[tp.List[Grid], int], None]] = {
+    "engines": bench_engines,
+    "strategies": bench_strategies,
+    "files": bench_files,
+    "adversarial": bench_adversarial,
+    "memory": lambda puzzles, reference: bench_memory(puzzles),
+    "batch": lambda puzzles, reference: bench_batch(puzzles, os.cpu_count() or 1),
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("what", choices=list(BENCHMARKS), nargs="?", default="engines")
+    parser.add_argument("--puzzles", default="hard_puzzles.txt")
+    parser.add_argument("--reference", type=int, default=1, help="сколько пазлов решать эталонным перебором")
+    args = parser.parse_args()
+    BENCHMARKS[args.what](read_puzzles(args.puzzles), args.reference)
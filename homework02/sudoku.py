@@ -1,8 +1,40 @@
+import argparse
+import collections
+import contextlib
+import dataclasses
+import functools
+import os
 import pathlib
+import random
+import sys
+import time
 import typing as tp
+from concurrent.futures import Future, ProcessPoolExecutor
 
 T = tp.TypeVar("T")
 
+DIGITS = "123456789"
+# Маска, в которой выставлены биты 1..9: бит d означает цифру d
+ALL_DIGITS = 0b1111111110
+# Сколько пазлов отправляется в процесс пула одной задачей
+CHUNK_SIZE = 256
+# Номер квадрата для каждой из 81 клетки, клетки нумеруются по строкам
+CELL_BLOCK = tuple((row // 3) * 3 + col // 3 for row in range(9) for col in range(9))
+# 27 групп клеток (строки, столбцы, квадраты), в каждой цифры 1..9 встречаются ровно по разу
+UNITS = tuple(
+    [tuple(row * 9 + col for col in range(9)) for row in range(9)]
+    + [tuple(row * 9 + col for row in range(9)) for col in range(9)]
+    + [tuple(cell for cell in range(81) if CELL_BLOCK[cell] == block) for block in range(9)]
+)
+
+
+@dataclasses.dataclass
+class SolveStats:
+    """Счётчики поиска: nodes - цифры, поставленные перебором, propagations - выведенные одиночки"""
+
+    nodes: int = 0
+    propagations: int = 0
+
 
 def read_sudoku(path: tp.Union[str, pathlib.Path]) -> tp.List[tp.List[str]]:
     """ Прочитать Судоку из указанного файла """
@@ -18,6 +50,141 @@ def create_grid(puzzle: str) -> tp.List[tp.List[str]]:
     return grid
 
 
+def grid_to_line(grid: tp.List[tp.List[str]]) -> str:
+    """Однострочный формат, как в hard_puzzles.txt
+    >>> grid_to_line(create_grid('53..7....' * 9)) == '53..7....' * 9
+    True
+    """
+    return "".join(value for row in grid for value in row)
+
+
+class Grid:
+    """
+    Компактное поле: 81 байт bytearray, по клетке на байт (0 - пустая, 1..9 - цифра), по строкам.
+    Вместо 10 списков на пазл один небольшой объект; строки и столбцы отдаются как memoryview
+    без копирования, квадрат - как три memoryview по его строкам.
+    >>> grid = Grid.from_list(read_sudoku('puzzle1.txt'))
+    >>> grid[0, 1], grid[0, 2]
+    ('3', '.')
+    >>> list(grid.row(0)), list(grid.col(0))
+    ([5, 3, 0, 0, 7, 0, 0, 0, 0], [5, 6, 0, 8, 4, 7, 0, 0, 0])
+    >>> [list(row) for row in grid.block(4)]
+    [[0, 6, 0], [8, 0, 3], [0, 2, 0]]
+    >>> grid.to_line()[:9]
+    '53..7....'
+    >>> Grid.unpack(grid.pack()) == grid, len(grid.pack())
+    (True, 41)
+    """
+
+    __slots__ = ("cells",)
+
+    def __init__(self, cells: tp.Optional[tp.Union[bytes, bytearray, memoryview]] = None) -> None:
+        self.cells = bytearray(cells) if cells is not None else bytearray(81)
+        if len(self.cells) != 81 or max(self.cells) > 9:
+            raise ValueError("grid must have 81 cells with values 0..9")
+
+    @classmethod
+    def from_line(cls, line: str) -> "Grid":
+        """Из однострочного формата; символы, кроме цифр и точек, пропускаются, как в create_grid"""
+        return cls(line.encode().translate(_FROM_TEXT, _NOT_LINE_CHARS))
+
+    @classmethod
+    def from_list(cls, grid: tp.List[tp.List[str]]) -> "Grid":
+        return cls.from_line(grid_to_line(grid))
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> "Grid":
+        """Обратно к pack"""
+        cells = bytearray(82)
+        cells[0::2] = bytes(byte >> 4 for byte in packed)
+        cells[1::2] = bytes(byte & 0xF for byte in packed)
+        return cls(cells[:81])
+
+    def pack(self) -> bytes:
+        """41 байт: по две клетки на байт, для хранения миллионов пазлов в одном буфере"""
+        cells = self.cells + b"\x00"
+        return bytes(high << 4 | low for high, low in zip(cells[0::2], cells[1::2]))
+
+    def to_line(self) -> str:
+        return self.cells.translate(_TO_TEXT).decode()
+
+    def to_list(self) -> tp.List[tp.List[str]]:
+        return create_grid(self.to_line())
+
+    def row(self, index: int) -> memoryview:
+        return memoryview(self.cells)[index * 9 : index * 9 + 9]
+
+    def col(self, index: int) -> memoryview:
+        return memoryview(self.cells)[index::9]
+
+    def block(self, index: int) -> tp.Tuple[memoryview, ...]:
+        start = index // 3 * 27 + index % 3 * 3
+        view = memoryview(self.cells)
+        return tuple(view[offset : offset + 3] for offset in range(start, start + 27, 9))
+
+    def solve(self, engine: str = "propagate") -> tp.Optional["Grid"]:
+        """Решение через solve(); исходное поле не меняется. О выборе движка см. solve"""
+        solution = solve(self.to_list(), engine)
+        return Grid.from_list(solution) if solution else None
+
+    def __getitem__(self, pos: tp.Tuple[int, int]) -> str:
+        return ".123456789"[self.cells[pos[0] * 9 + pos[1]]]
+
+    def __setitem__(self, pos: tp.Tuple[int, int], value: str) -> None:
+        self.cells[pos[0] * 9 + pos[1]] = ".123456789".index(value)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Grid) and self.cells == other.cells
+
+    def __repr__(self) -> str:
+        return f"Grid.from_line({self.to_line()!r})"
+
+
+_NOT_LINE_CHARS = bytes(c for c in range(256) if c not in b"123456789.")
+_FROM_TEXT = bytes.maketrans(b".123456789", bytes(range(10)))
+_TO_TEXT = bytes.maketrans(bytes(range(10)), b".123456789")
+
+
+class GridBatch:
+    """
+    Много пазлов подряд в одном bytearray, по 81 байту на пазл в формате Grid.cells:
+    на миллионах пазлов нет даже объекта Grid на каждый. Grid создаётся только при обращении.
+    >>> batch = GridBatch.from_lines(open('hard_puzzles.txt'))
+    >>> len(batch), batch[0].to_line() == open('hard_puzzles.txt').readline().strip()
+    (95, True)
+    """
+
+    __slots__ = ("cells",)
+
+    def __init__(self) -> None:
+        self.cells = bytearray()
+
+    @classmethod
+    def from_lines(cls, lines: tp.Iterable[str]) -> "GridBatch":
+        """Пазлы в однострочном формате; пустые строки пропускаются"""
+        batch = cls()
+        for line in lines:
+            if line.strip():
+                batch.append(Grid.from_line(line))
+        return batch
+
+    def append(self, grid: Grid) -> None:
+        self.cells += grid.cells
+
+    def __len__(self) -> int:
+        return len(self.cells) // 81
+
+    def __getitem__(self, index: int) -> Grid:
+        if not -len(self) <= index < len(self):
+            raise IndexError("grid index out of range")
+        start = index % len(self) * 81
+        return Grid(self.cells[start : start + 81])
+
+    def __iter__(self) -> tp.Iterator[Grid]:
+        for start in range(0, len(self.cells), 81):
+            yield Grid(self.cells[start : start + 81])
+
+
 def display(grid: tp.List[tp.List[str]]) -> None:
     """Вывод Судоку """
     width = 2
@@ -41,7 +208,7 @@ def group(values: tp.List[T], n: int) -> tp.List[tp.List[T]]:
     >>> group([1,2,3,4,5,6,7,8,9], 3)
     [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
     """
-    pass
+    return [values[i : i + n] for i in range(0, len(values), n)]
 
 
 def get_row(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.List[str]:
@@ -53,7 +220,7 @@ def get_row(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.List[str
     >>> get_row([['1', '2', '3'], ['4', '5', '6'], ['.', '8', '9']], (2, 0))
     ['.', '8', '9']
     """
-    pass
+    return grid[pos[0]]
 
 
 def get_col(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.List[str]:
@@ -65,7 +232,7 @@ def get_col(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.List[str
     >>> get_col([['1', '2', '3'], ['4', '5', '6'], ['.', '8', '9']], (0, 2))
     ['3', '6', '9']
     """
-    pass
+    return [row[pos[1]] for row in grid]
 
 
 def get_block(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.List[str]:
@@ -78,7 +245,8 @@ def get_block(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.List[s
     >>> get_block(grid, (8, 8))
     ['2', '8', '.', '.', '.', '5', '.', '7', '9']
     """
-    pass
+    top, left = pos[0] // 3 * 3, pos[1] // 3 * 3
+    return [grid[row][col] for row in range(top, top + 3) for col in range(left, left + 3)]
 
 
 def find_empty_positions(grid: tp.List[tp.List[str]]) -> tp.Optional[tp.Tuple[int, int]]:
@@ -90,7 +258,11 @@ def find_empty_positions(grid: tp.List[tp.List[str]]) -> tp.Optional[tp.Tuple[in
     >>> find_empty_positions([['1', '2', '3'], ['4', '5', '6'], ['.', '8', '9']])
     (2, 0)
     """
-    pass
+    for row, values in enumerate(grid):
+        for col, value in enumerate(values):
+            if value == ".":
+                return row, col
+    return None
 
 
 def find_possible_values(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.Set[str]:
@@ -103,11 +275,25 @@ def find_possible_values(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -
     >>> values == {'2', '5', '9'}
     True
     """
-    pass
+    return set(DIGITS) - set(get_row(grid, pos)) - set(get_col(grid, pos)) - set(get_block(grid, pos))
 
 
-def solve(grid: tp.List[tp.List[str]]) -> tp.Optional[tp.List[tp.List[str]]]:
-    """ Решение пазла, заданного в grid """
+def solve(
+    grid: tp.List[tp.List[str]],
+    engine: str = "propagate",
+    stats: tp.Optional[SolveStats] = None,
+    reject_repeated: bool = False,
+) -> tp.Optional[tp.List[tp.List[str]]]:
+    """
+    Решение пазла, заданного в grid, движком engine из ENGINES. Сам grid не изменяется.
+    Если передан stats, к нему прибавляются счётчики поиска. С reject_repeated пазл, данные
+    которого повторяют цифру в строке, столбце или квадрате, сразу считается нерешаемым.
+    Движок по умолчанию, propagate, решает пазлы с повторяющимися данными так же, как эталонный
+    перебор, но на нерешаемом пазле перебирает все варианты: на ADVERSARIAL["impossible"]
+    из bench_sudoku.py это больше двух минут. dlx отвергает такой пазл за доли секунды и в среднем
+    быстрее, но пазлы с повторяющимися данными считает нерешаемыми, поэтому для непроверенных
+    данных стоит передавать engine="dlx".
+    """
     """ Как решать Судоку?
         1. Найти свободную позицию
         2. Найти все возможные значения, которые могут находиться на этой позиции
@@ -118,17 +304,409 @@ def solve(grid: tp.List[tp.List[str]]) -> tp.Optional[tp.List[tp.List[str]]]:
     >>> solve(grid)
     [['5', '3', '4', '6', '7', '8', '9', '1', '2'], ['6', '7', '2', '1', '9', '5', '3', '4', '8'], ['1', '9', '8', '3', '4', '2', '5', '6', '7'], ['8', '5', '9', '7', '6', '1', '4', '2', '3'], ['4', '2', '6', '8', '5', '3', '7', '9', '1'], ['7', '1', '3', '9', '2', '4', '8', '5', '6'], ['9', '6', '1', '5', '3', '7', '2', '8', '4'], ['2', '8', '7', '4', '1', '9', '6', '3', '5'], ['3', '4', '5', '2', '8', '6', '1', '7', '9']]
     """
-    pass
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+    if reject_repeated and has_repeated_givens(grid):
+        return None
+    return ENGINES[engine](grid, stats if stats is not None else SolveStats())
+
+
+def has_repeated_givens(grid: tp.List[tp.List[str]]) -> bool:
+    """Есть ли цифра, которая дважды стоит в одной строке, столбце или квадрате
+    >>> has_repeated_givens(create_grid('11' + '.' * 79)), has_repeated_givens(read_sudoku('puzzle1.txt'))
+    (True, False)
+    """
+    cells = [value for row in grid for value in row]
+    for unit in UNITS:
+        givens = [cells[cell] for cell in unit if cells[cell] != "."]
+        if len(set(givens)) != len(givens):
+            return True
+    return False
+
+
+def solve_backtracking(grid: tp.List[tp.List[str]], stats: SolveStats) -> tp.Optional[tp.List[tp.List[str]]]:
+    """Эталонный перебор с возвратом на списках строк, оставлен для сравнения"""
+    grid = [row[:] for row in grid]
+    return grid if _backtrack(grid, stats) else None
+
+
+def _backtrack(grid: tp.List[tp.List[str]], stats: SolveStats) -> bool:
+    pos = find_empty_positions(grid)
+    if pos is None:
+        return True
+    row, col = pos
+    for value in sorted(find_possible_values(grid, pos)):
+        grid[row][col] = value
+        stats.nodes += 1
+        if _backtrack(grid, stats):
+            return True
+    grid[row][col] = "."
+    return False
+
+
+class BitmaskBoard:
+    """
+    Поле из 81 клетки (0 - пустая) и маски цифр, уже занятых в каждой строке, столбце и квадрате.
+    place и undo обновляют маски на месте, поэтому кандидаты клетки - пара битовых операций
+    вместо сборки списков get_row/get_col/get_block.
+    """
+
+    __slots__ = ("cells", "rows", "cols", "blocks")
+
+    def __init__(self, grid: tp.List[tp.List[str]]) -> None:
+        self.cells = [0] * 81
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.blocks = [0] * 9
+        for cell, value in enumerate(value for row in grid for value in row):
+            if value != ".":
+                self.place(cell, int(value))
+
+    def candidates(self, cell: int) -> int:
+        """Маска цифр, которые можно поставить в клетку cell"""
+        return ALL_DIGITS & ~(self.rows[cell // 9] | self.cols[cell % 9] | self.blocks[CELL_BLOCK[cell]])
+
+    def place(self, cell: int, digit: int) -> None:
+        bit = 1 << digit
+        self.cells[cell] = digit
+        self.rows[cell // 9] |= bit
+        self.cols[cell % 9] |= bit
+        self.blocks[CELL_BLOCK[cell]] |= bit
+
+    def undo(self, cell: int, digit: int) -> None:
+        """Убрать цифру, поставленную place. Цифра не должна была стоять в строке, столбце и квадрате до этого"""
+        mask = ~(1 << digit)
+        self.cells[cell] = 0
+        self.rows[cell // 9] &= mask
+        self.cols[cell % 9] &= mask
+        self.blocks[CELL_BLOCK[cell]] &= mask
+
+    def empty_cells(self) -> tp.List[int]:
+        return [cell for cell, digit in enumerate(self.cells) if not digit]
+
+    def to_grid(self) -> tp.List[tp.List[str]]:
+        return group([str(digit) if digit else "." for digit in self.cells], 9)
+
+
+def solve_bitmask(grid: tp.List[tp.List[str]], stats: SolveStats) -> tp.Optional[tp.List[tp.List[str]]]:
+    """
+    Перебор с возвратом на масках BitmaskBoard. Следующей заполняется пустая клетка с наименьшим
+    числом кандидатов: по маскам это почти бесплатно, а порядок чтения на трудных пазлах даёт
+    миллионы лишних узлов. Клетка без кандидатов сразу означает тупик.
+    """
+    board = BitmaskBoard(grid)
+    return board.to_grid() if _search_bitmask(board, board.empty_cells(), 0, stats) else None
+
+
+def _search_bitmask(board: BitmaskBoard, empty: tp.List[int], index: int, stats: SolveStats) -> bool:
+    if index == len(empty):
+        return True
+    best, best_count = index, 10
+    for i in range(index, len(empty)):
+        count = board.candidates(empty[i]).bit_count()
+        if count < best_count:
+            best, best_count = i, count
+            if count <= 1:
+                break
+    empty[index], empty[best] = empty[best], empty[index]
+    cell = empty[index]
+    candidates = board.candidates(cell)
+    while candidates:
+        bit = candidates & -candidates
+        candidates ^= bit
+        digit = bit.bit_length() - 1
+        board.place(cell, digit)
+        stats.nodes += 1
+        if _search_bitmask(board, empty, index + 1, stats):
+            return True
+        board.undo(cell, digit)
+    return False
+
+
+def solve_propagate(grid: tp.List[tp.List[str]], stats: SolveStats) -> tp.Optional[tp.List[tp.List[str]]]:
+    """
+    Перед каждым ветвлением ставит одиночки, пока они находятся: голые (у клетки один кандидат)
+    и скрытые (цифру в строке, столбце или квадрате можно поставить только в одну клетку).
+    Ветвится по клетке с наименьшим числом кандидатов.
+    """
+    board = BitmaskBoard(grid)
+    # Группы, где уже повторяется какая-то цифра, не обязаны содержать все цифры, поэтому
+    # скрытые одиночки в них не ищутся: так пазлы с противоречивыми данными решаются как у solve_backtracking
+    units: tp.List[tp.Tuple[int, ...]] = []
+    for unit in UNITS:
+        givens = [board.cells[cell] for cell in unit if board.cells[cell]]
+        if len(set(givens)) == len(givens):
+            units.append(unit)
+    return board.to_grid() if _search_propagate(board, units, stats) else None
+
+
+def _search_propagate(board: BitmaskBoard, units: tp.List[tp.Tuple[int, ...]], stats: SolveStats) -> bool:
+    placed: tp.List[int] = []
+    if _propagate(board, units, placed, stats):
+        best, best_candidates, best_count = -1, 0, 10
+        for cell, digit in enumerate(board.cells):
+            if not digit:
+                candidates = board.candidates(cell)
+                count = candidates.bit_count()
+                if count < best_count:
+                    best, best_candidates, best_count = cell, candidates, count
+                    if count == 2:
+                        break
+        if best < 0:
+            return True
+        while best_candidates:
+            bit = best_candidates & -best_candidates
+            best_candidates ^= bit
+            digit = bit.bit_length() - 1
+            board.place(best, digit)
+            stats.nodes += 1
+            if _search_propagate(board, units, stats):
+                return True
+            board.undo(best, digit)
+    for cell in placed:
+        board.undo(cell, board.cells[cell])
+    return False
+
+
+def _propagate(
+    board: BitmaskBoard, units: tp.List[tp.Tuple[int, ...]], placed: tp.List[int], stats: SolveStats
+) -> bool:
+    """
+    Ставит одиночки до неподвижной точки, записывая клетки в placed, чтобы их можно было снять.
+    Возвращает False, если нашлось противоречие: клетка без кандидатов или цифра, которой негде стоять.
+    """
+    cells = board.cells
+    changed = True
+    while changed:
+        changed = False
+        for cell in range(81):
+            if not cells[cell]:
+                candidates = board.candidates(cell)
+                if not candidates:
+                    return False
+                if not candidates & (candidates - 1):
+                    board.place(cell, candidates.bit_length() - 1)
+                    placed.append(cell)
+                    stats.propagations += 1
+                    changed = True
+        for unit in units:
+            once = twice = filled = 0
+            for cell in unit:
+                if cells[cell]:
+                    filled |= 1 << cells[cell]
+                else:
+                    candidates = board.candidates(cell)
+                    twice |= once & candidates
+                    once |= candidates
+            if once | filled != ALL_DIGITS:
+                return False
+            singles = once & ~twice & ~filled
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                cell = next((cell for cell in unit if not cells[cell] and board.candidates(cell) & bit), -1)
+                if cell < 0:
+                    # Единственная клетка для этой цифры уже занята другой скрытой одиночкой
+                    return False
+                board.place(cell, bit.bit_length() - 1)
+                placed.append(cell)
+                stats.propagations += 1
+                changed = True
+    return True
+
+
+# Столбцы задачи о точном покрытии: клетка занята, цифра есть в строке, в столбце, в квадрате
+DLX_COLUMNS = 4 * 81
+
+
+class DancingLinks:
+    """
+    Алгоритм X Кнута на танцующих ссылках. Узлы хранятся не объектами, а индексами в параллельных
+    списках left/right/up/down/column: 0 - корень, 1..DLX_COLUMNS - заголовки столбцов, дальше
+    по 4 узла на каждую из 729 строк-вариантов (клетка, цифра). Шаблон строится один раз,
+    каждый пазл получает его копию.
+    """
+
+    __slots__ = ("left", "right", "up", "down", "column", "size", "solution")
+
+    def __init__(self) -> None:
+        self.left, self.right, self.up, self.down, self.column, self.size = (list(a) for a in _dlx_template())
+        self.solution: tp.List[int] = []
+
+    def select(self, option: int) -> bool:
+        """Взять вариант option = cell * 9 + digit - 1 как данный. False, если он противоречит уже взятым"""
+        first = DLX_COLUMNS + 1 + option * 4
+        if any(self.right[self.left[self.column[node]]] != self.column[node] for node in range(first, first + 4)):
+            return False
+        for node in range(first, first + 4):
+            self.cover(self.column[node])
+        self.solution.append(option)
+        return True
+
+    def cover(self, col: int) -> None:
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col: int) -> None:
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def search(self, limit: int, found: tp.List[tp.List[int]], stats: SolveStats) -> int:
+        """
+        Считает покрытия, но не больше limit. Первое найденное (список вариантов) кладётся в found.
+        Ветвится по столбцу с наименьшим числом строк.
+        """
+        right, down, size = self.right, self.down, self.size
+        if right[0] == 0:
+            if not found:
+                found.append(list(self.solution))
+            return 1
+        col, best = right[0], 10
+        i = col
+        while i:
+            if size[i] < best:
+                col, best = i, size[i]
+                if best <= 1:
+                    break
+            i = right[i]
+        if not best:
+            return 0
+        count = 0
+        self.cover(col)
+        node = down[col]
+        while node != col and count < limit:
+            stats.nodes += 1
+            self.solution.append((node - DLX_COLUMNS - 1) // 4)
+            j = right[node]
+            while j != node:
+                self.cover(self.column[j])
+                j = right[j]
+            count += self.search(limit - count, found, stats)
+            j = self.left[node]
+            while j != node:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            self.solution.pop()
+            node = down[node]
+        self.uncover(col)
+        return count
+
+
+@functools.lru_cache(maxsize=None)
+def _dlx_template() -> tp.Tuple[tp.List[int], ...]:
+    headers = DLX_COLUMNS + 1
+    left = [i - 1 for i in range(headers)]
+    right = [i + 1 for i in range(headers)]
+    left[0], right[-1] = DLX_COLUMNS, 0
+    up = list(range(headers))
+    down = list(range(headers))
+    column = list(range(headers))
+    size = [0] * headers
+    for cell in range(81):
+        row, col, block = cell // 9, cell % 9, CELL_BLOCK[cell]
+        for digit in range(9):
+            first = len(left)
+            for node, col_header in enumerate(
+                (1 + cell, 1 + 81 + row * 9 + digit, 1 + 162 + col * 9 + digit, 1 + 243 + block * 9 + digit), first
+            ):
+                left.append(first + (node - first - 1) % 4)
+                right.append(first + (node - first + 1) % 4)
+                up.append(up[col_header])
+                down.append(col_header)
+                down[up[col_header]] = node
+                up[col_header] = node
+                column.append(col_header)
+                size[col_header] += 1
+    return left, right, up, down, column, size
+
+
+def _dlx_search(
+    grid: tp.List[tp.List[str]], limit: int, stats: SolveStats
+) -> tp.Tuple[int, tp.Optional[tp.List[tp.List[str]]]]:
+    """Число решений (не больше limit) и первое из них. Противоречивые данные означают 0 решений"""
+    links = DancingLinks()
+    for cell, value in enumerate(value for row in grid for value in row):
+        if value != "." and not links.select(cell * 9 + int(value) - 1):
+            return 0, None
+    found: tp.List[tp.List[int]] = []
+    count = links.search(limit, found, stats)
+    if not found:
+        return count, None
+    cells = ["."] * 81
+    for option in found[0]:
+        cells[option // 9] = str(option % 9 + 1)
+    return count, group(cells, 9)
+
+
+def solve_dlx(grid: tp.List[tp.List[str]], stats: SolveStats) -> tp.Optional[tp.List[tp.List[str]]]:
+    """
+    Судоку как точное покрытие 324 условий вариантами (клетка, цифра). В отличие от остальных
+    движков, пазл с повторяющимися данными считается нерешаемым: такие данные не покрыть точно
+    """
+    return _dlx_search(grid, 1, stats)[1]
+
+
+def count_solutions(grid: tp.List[tp.List[str]], limit: int = 2) -> int:
+    """Число решений пазла, но не больше limit: для проверки единственности хватает limit = 2
+    >>> count_solutions(read_sudoku('puzzle1.txt'))
+    1
+    >>> count_solutions([['.'] * 9 for _ in range(9)], limit=5)
+    5
+    """
+    return _dlx_search(grid, limit, SolveStats())[0]
+
+
+def has_unique_solution(grid: tp.List[tp.List[str]]) -> bool:
+    return count_solutions(grid, 2) == 1
+
+
+ENGINES: tp.Dict[str, tp.Callable[[tp.List[tp.List[str]], SolveStats], tp.Optional[tp.List[tp.List[str]]]]] = {
+    "propagate": solve_propagate,
+    "bitmask": solve_bitmask,
+    "dlx": solve_dlx,
+    "backtracking": solve_backtracking,
+}
 
 
 def check_solution(solution: tp.List[tp.List[str]]) -> bool:
-    """ Если решение solution верно, то вернуть True, в противном случае False """
-    # TODO: Add doctests with bad puzzles
-    pass
+    """ Если решение solution верно, то вернуть True, в противном случае False
+    >>> check_solution([[str(v) for v in range(1, 10)]] * 9)
+    False
+    >>> check_solution(solve(read_sudoku('puzzle1.txt')))
+    True
+    """
+    digits = set(DIGITS)
+    return all(
+        set(get_row(solution, (i, 0))) == digits
+        and set(get_col(solution, (0, i))) == digits
+        and set(get_block(solution, (i // 3 * 3, i % 3 * 3))) == digits
+        for i in range(9)
+    )
 
 
 def generate_sudoku(N: int) -> tp.List[tp.List[str]]:
-    """Генерация судоку заполненного на N элементов
+    """Генерация судоку заполненного на N элементов. Клетки убираются так, чтобы решение оставалось
+    единственным; если для этого N слишком мало, недостающие клетки убираются без проверки
     >>> grid = generate_sudoku(40)
     >>> sum(1 for row in grid for e in row if e == '.')
     41
@@ -148,14 +726,163 @@ def generate_sudoku(N: int) -> tp.List[tp.List[str]]:
     >>> check_solution(solution)
     True
     """
-    pass
+    solution = solve([["."] * 9 for _ in range(9)])
+    assert solution is not None
+    # Перестановки цифр, строк внутри полос и самих полос (и то же для столбцов) сохраняют решение
+    digits = dict(zip(DIGITS, random.sample(DIGITS, 9)))
+    rows = [band * 3 + row for band in random.sample(range(3), 3) for row in random.sample(range(3), 3)]
+    cols = [stack * 3 + col for stack in random.sample(range(3), 3) for col in random.sample(range(3), 3)]
+    grid = [[digits[solution[row][col]] for col in cols] for row in rows]
+    filled = 81
+    target = min(max(N, 0), 81)
+    cells = random.sample(range(81), 81)
+    for cell in cells:
+        if filled == target:
+            return grid
+        row, col = divmod(cell, 9)
+        value, grid[row][col] = grid[row][col], "."
+        if has_unique_solution(grid):
+            filled -= 1
+        else:
+            grid[row][col] = value
+    for cell in cells:
+        if filled == target:
+            break
+        row, col = divmod(cell, 9)
+        if grid[row][col] != ".":
+            grid[row][col] = "."
+            filled -= 1
+    return grid
+
+
+@dataclasses.dataclass
+class BatchReport:
+    """Итог solve_file: сколько пазлов прочитано и решено и сколько секунд это заняло"""
+
+    puzzles: int = 0
+    solved: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Пазлов в секунду"""
+        return self.puzzles / self.elapsed if self.elapsed else 0.0
+
+
+def _solve_chunk(lines: tp.List[str], engine: str) -> tp.List[tp.Tuple[tp.Optional[str], float]]:
+    """
+    Решает пачку однострочных пазлов в процессе пула: решение (или None) и время на каждый.
+    Строка не из 81 клетки и пазл с повторяющимися данными считаются нерешаемыми, чтобы
+    одна испорченная строка не обрывала весь файл и не запускала долгий перебор.
+    """
+    results: tp.List[tp.Tuple[tp.Optional[str], float]] = []
+    for line in lines:
+        start = time.perf_counter()
+        grid = create_grid(line)
+        solution = solve(grid, engine, reject_repeated=True) if len(grid_to_line(grid)) == 81 else None
+        elapsed = time.perf_counter() - start
+        results.append((grid_to_line(solution) if solution else None, elapsed))
+    return results
+
+
+def _chunks(lines: tp.Iterable[str], chunk_size: int) -> tp.Iterator[tp.List[str]]:
+    chunk: tp.List[str] = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_lines(
+    lines: tp.Iterable[str], workers: tp.Optional[int] = None, engine: str = "dlx", chunk_size: int = CHUNK_SIZE
+) -> tp.Iterator[tp.Tuple[str, tp.Optional[str], float]]:
+    """
+    Решает однострочные пазлы пачками по chunk_size в пуле из workers процессов (по умолчанию
+    на всех ядрах) и возвращает (пазл, решение или None, секунды) в порядке входа.
+    Строки читаются лениво: в работе держится не больше 2 * workers пачек, так что файл
+    может быть сколь угодно длинным. Пустые строки пропускаются. По умолчанию работает dlx:
+    выход идёт в порядке входа, и движки, перебирающие клетки, задержали бы весь файл
+    на минуты на одном нерешаемом пазле, а dlx отвергает его за доли секунды.
+    >>> [solution[:9] for _, solution, _ in solve_lines(open('hard_puzzles.txt').readlines()[:3], workers=1)]
+    ['417369825', '527316489', '617459823']
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(lines, chunk_size):
+            for line, (solution, elapsed) in zip(chunk, _solve_chunk(chunk, engine)):
+                yield line, solution, elapsed
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: tp.Deque[tp.Tuple[tp.List[str], Future]] = collections.deque()
+        chunks = _chunks(lines, chunk_size)
+        try:
+            for chunk in chunks:
+                pending.append((chunk, executor.submit(_solve_chunk, chunk, engine)))
+                if len(pending) < 2 * workers:
+                    continue
+                chunk, future = pending.popleft()
+                for line, (solution, elapsed) in zip(chunk, future.result()):
+                    yield line, solution, elapsed
+            while pending:
+                chunk, future = pending.popleft()
+                for line, (solution, elapsed) in zip(chunk, future.result()):
+                    yield line, solution, elapsed
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def solve_file(
+    path: tp.Union[str, pathlib.Path],
+    output: tp.Optional[tp.Union[str, pathlib.Path]] = None,
+    workers: tp.Optional[int] = None,
+    engine: str = "dlx",
+    chunk_size: int = CHUNK_SIZE,
+) -> BatchReport:
+    """
+    Решает файл с пазлами в однострочном формате (по пазлу на строку) через solve_lines и пишет
+    в output (по умолчанию в stdout) строку на каждый пазл в том же порядке: решение и время
+    в миллисекундах через табуляцию. Нерешаемый пазл или испорченная строка выводятся как есть.
+    """
+    report = BatchReport()
+    start = time.perf_counter()
+    sink: tp.ContextManager[tp.TextIO] = open(output, "w") if output is not None else contextlib.nullcontext(sys.stdout)
+    with open(path) as fin, sink as fout:
+        for line, solution, elapsed in solve_lines(fin, workers, engine, chunk_size):
+            report.puzzles += 1
+            report.solved += solution is not None
+            fout.write(f"{solution or line}\t{elapsed * 1e3:.3f}\n")
+    report.elapsed = time.perf_counter() - start
+    return report
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Решение Судоку: puzzle1-3.txt или файл пазлов по одному на строку")
+    parser.add_argument("path", nargs="?", help="файл с пазлами в однострочном формате, как hard_puzzles.txt")
+    parser.add_argument("-o", "--output", help="куда писать решения, по умолчанию stdout")
+    parser.add_argument("-w", "--workers", type=int, help="число процессов, по умолчанию все ядра")
+    parser.add_argument("--engine", choices=list(ENGINES), default="dlx", help="движок, по умолчанию dlx")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.path is not None:
+        batch = solve_file(args.path, args.output, args.workers, args.engine, args.chunk_size)
+        print(
+            f"{batch.solved}/{batch.puzzles} solved in {batch.elapsed:.3f} s, {batch.rate:.1f} puzzles/s",
+            file=sys.stderr,
+        )
+        sys.exit(0)
     for fname in ["puzzle1.txt", "puzzle2.txt", "puzzle3.txt"]:
         grid = read_sudoku(fname)
         display(grid)
-        solution = solve(grid)
+        solution = solve(grid, args.engine)
         if not solution:
             print(f"Puzzle {fname} can't be solved")
         else:
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 
 import sudoku
@@ -239,4 +241,141 @@ class SudokuTestCase(unittest.TestCase):
         self.assertEqual(expected_unknown, actual_unknown)
         solution = sudoku.solve(grid)
         solved = sudoku.check_solution(solution)
-        self.assertTrue(solved)
\ No newline at end of file
+        self.assertTrue(solved)
+
+    def test_engines_agree(self):
+        for fname in ("puzzle1.txt", "puzzle2.txt", "puzzle3.txt"):
+            grid = sudoku.read_sudoku(fname)
+            with self.subTest(fname=fname):
+                expected = sudoku.solve(grid, engine="backtracking")
+                self.assertEqual(expected, sudoku.solve(grid, engine="bitmask"))
+                self.assertEqual(sudoku.read_sudoku(fname), grid)
+
+    def test_bitmask_hard_puzzles(self):
+        with open("hard_puzzles.txt") as f:
+            puzzles = [sudoku.create_grid(line) for line in f][:10]
+        for i, grid in enumerate(puzzles):
+            with self.subTest(puzzle=i):
+                solution = sudoku.solve(grid, engine="bitmask")
+                self.assertTrue(sudoku.check_solution(solution))
+                givens = [(r, c) for r in range(9) for c in range(9) if grid[r][c] != "."]
+                self.assertTrue(all(solution[r][c] == grid[r][c] for r, c in givens))
+
+    def test_unsolvable_and_unknown_engine(self):
+        grid = sudoku.read_sudoku("puzzle1.txt")
+        grid[0][2] = "5"
+        grid[0][3] = "3"
+        self.assertIsNone(sudoku.solve(grid, engine="bitmask"))
+        with self.assertRaises(ValueError):
+            sudoku.solve(grid, engine="magic")
+        repeated = sudoku.create_grid("11" + "." * 79)
+        for engine in sudoku.ENGINES:
+            with self.subTest(engine=engine):
+                self.assertIsNone(sudoku.solve(repeated, engine=engine, reject_repeated=True))
+
+    def test_propagate_stats(self):
+        with open("hard_puzzles.txt") as f:
+            puzzles = [sudoku.create_grid(line) for line in f][:10]
+        for i, grid in enumerate(puzzles):
+            with self.subTest(puzzle=i):
+                propagate, bitmask = sudoku.SolveStats(), sudoku.SolveStats()
+                solution = sudoku.solve(grid, engine="propagate", stats=propagate)
+                self.assertEqual(sudoku.solve(grid, engine="bitmask", stats=bitmask), solution)
+                self.assertGreater(propagate.propagations, 0)
+                self.assertLess(propagate.nodes, bitmask.nodes)
+        stats = sudoku.SolveStats()
+        solution = sudoku.solve(sudoku.read_sudoku("puzzle1.txt"), stats=stats)
+        self.assertTrue(sudoku.check_solution(solution))
+        self.assertEqual(sudoku.SolveStats(nodes=0, propagations=51), stats)
+
+    def test_dlx(self):
+        with open("hard_puzzles.txt") as f:
+            puzzles = [sudoku.create_grid(line) for line in f][:10]
+        for i, grid in enumerate(puzzles):
+            with self.subTest(puzzle=i):
+                self.assertEqual(sudoku.solve(grid), sudoku.solve(grid, engine="dlx"))
+                self.assertTrue(sudoku.has_unique_solution(grid))
+        grid = sudoku.read_sudoku("puzzle1.txt")
+        grid[0][0] = "."
+        self.assertEqual(1, sudoku.count_solutions(grid))
+        self.assertEqual(7, sudoku.count_solutions([["."] * 9 for _ in range(9)], limit=7))
+        grid[0][2] = "3"
+        grid[1][2] = "3"
+        self.assertIsNone(sudoku.solve(grid, engine="dlx"))
+        self.assertEqual(0, sudoku.count_solutions(grid))
+        impossible = ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4........."
+        self.assertEqual(0, sudoku.count_solutions(sudoku.create_grid(impossible)))
+
+    def test_generate_unique(self):
+        grid = sudoku.generate_sudoku(35)
+        self.assertEqual(35, sum(1 for row in grid for e in row if e != "."))
+        self.assertTrue(sudoku.has_unique_solution(grid))
+
+    def test_solve_file(self):
+        with open("hard_puzzles.txt") as f:
+            lines = [line.strip() for line in f][:20]
+        impossible = ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4........."
+        lines[5] = impossible
+        with tempfile.TemporaryDirectory() as tmp:
+            src, dst = os.path.join(tmp, "puzzles"), os.path.join(tmp, "solutions")
+            with open(src, "w") as f:
+                f.write("\n".join(lines[:10]) + "\n\n" + "\n".join(lines[10:]) + "\n")
+            for workers in (1, 2):
+                with self.subTest(workers=workers):
+                    report = sudoku.solve_file(src, dst, workers=workers, engine="dlx", chunk_size=3)
+                    self.assertEqual((20, 19), (report.puzzles, report.solved))
+                    self.assertGreater(report.rate, 0)
+                    with open(dst) as f:
+                        output = [line.rstrip("\n").split("\t") for line in f]
+                    self.assertEqual(20, len(output))
+                    for line, (solution, elapsed) in zip(lines, output):
+                        expected = sudoku.solve(sudoku.create_grid(line), engine="dlx")
+                        self.assertEqual(sudoku.grid_to_line(expected) if expected else line, solution)
+                        self.assertGreaterEqual(float(elapsed), 0)
+            with open(src, "w") as f:
+                f.write(impossible + "\n")
+            self.assertEqual(0, sudoku.solve_file(src, dst, workers=1).solved)
+            malformed = ["garbage", lines[0][:80], "11" + "." * 79, lines[0] + "1"]
+            with open(src, "w") as f:
+                f.write("\n".join(malformed + [lines[0]]) + "\n")
+            for workers in (1, 2):
+                with self.subTest(workers=workers, malformed=True):
+                    report = sudoku.solve_file(src, dst, workers=workers)
+                    self.assertEqual((5, 1), (report.puzzles, report.solved))
+                    with open(dst) as f:
+                        output = [line.split("\t")[0] for line in f]
+                    self.assertEqual(malformed, output[:4])
+
+    def test_grid(self):
+        nested = sudoku.read_sudoku("puzzle1.txt")
+        grid = sudoku.Grid.from_list(nested)
+        self.assertEqual(nested, grid.to_list())
+        self.assertEqual(grid, sudoku.Grid.from_line(sudoku.grid_to_line(nested)))
+        self.assertEqual(grid, sudoku.Grid.unpack(grid.pack()))
+        for i in range(9):
+            with self.subTest(i=i):
+                self.assertEqual(sudoku.get_row(nested, (i, 0)), [".123456789"[v] for v in grid.row(i)])
+                self.assertEqual(sudoku.get_col(nested, (0, i)), [".123456789"[v] for v in grid.col(i)])
+                pos = (i // 3 * 3, i % 3 * 3)
+                block = [".123456789"[v] for row in grid.block(i) for v in row]
+                self.assertEqual(sudoku.get_block(nested, pos), block)
+        view = grid.row(0)
+        grid[0, 2] = "4"
+        self.assertEqual(4, view[2])
+        self.assertEqual("4", grid[0, 2])
+        self.assertEqual(sudoku.solve(nested), grid.solve().to_list())
+        with self.assertRaises(ValueError):
+            sudoku.Grid(bytes(80))
+        with self.assertRaises(ValueError):
+            sudoku.Grid(bytes([10] * 81))
+
+    def test_grid_batch(self):
+        with open("hard_puzzles.txt") as f:
+            lines = [line.strip() for line in f]
+        batch = sudoku.GridBatch.from_lines(lines + [""])
+        self.assertEqual(len(lines), len(batch))
+        self.assertEqual(81 * len(lines), len(batch.cells))
+        self.assertEqual(lines, [grid.to_line() for grid in batch])
+        self.assertEqual(lines[-1], batch[-1].to_line())
+        with self.assertRaises(IndexError):
+            batch[len(lines)]